@@ -0,0 +1,230 @@
+"""
+Model Registry - hot reload and shadow scoring for the credit model
+
+Watches the live model file (and optionally a candidate file) for new
+versions written by scripts/train_model.py. New versions are unpickled
+on a background thread and staged; the scorer picks them up with
+apply_pending() between batches, so a swap never happens mid-batch and
+never costs a restart or a cold load on the request path.
+
+When a candidate model is present it is shadow-scored on the same
+feature rows as the live model, off the request path, and the registry
+keeps latency and score-difference metrics for the comparison.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def file_version(path):
+    """
+    Cheap version stamp for a model file: (mtime_ns, size), or None if missing
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class ShadowMetrics:
+    """
+    Running comparison of candidate vs live predictions
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.errors = 0
+            self.sum_abs_diff = 0.0
+            self.max_abs_diff = 0.0
+            self.decision_flips = 0
+            self.live_ms = 0.0
+            self.shadow_ms = 0.0
+            self.batches = 0
+
+    def record(self, live_scores, shadow_scores, live_ms, shadow_ms):
+        with self._lock:
+            self.batches += 1
+            self.live_ms += live_ms
+            self.shadow_ms += shadow_ms
+            for live, shadow in zip(live_scores, shadow_scores):
+                diff = abs(float(shadow) - float(live))
+                self.rows += 1
+                self.sum_abs_diff += diff
+                self.max_abs_diff = max(self.max_abs_diff, diff)
+                if (live >= self.threshold) != (shadow >= self.threshold):
+                    self.decision_flips += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            batches = max(1, self.batches)
+            return {
+                'rows': self.rows,
+                'errors': self.errors,
+                'mean_abs_diff': self.sum_abs_diff / self.rows if self.rows else 0.0,
+                'max_abs_diff': self.max_abs_diff,
+                'decision_flips': self.decision_flips,
+                'live_ms_per_batch': self.live_ms / batches,
+                'shadow_ms_per_batch': self.shadow_ms / batches,
+            }
+
+class ModelRegistry:
+    """
+    Holds the live model, stages new versions and runs shadow comparisons
+
+    ARGS:
+        path: Live model file to watch
+        loader: Callable(path) -> model or None (scoring.load_ml_model)
+        initial: Model already loaded from `path`, if any
+        candidate_path: Optional file with a model to shadow-score
+        poll_interval: Seconds between file checks
+        threshold: Approval threshold used to count decision flips
+        report_every: Print shadow metrics every N compared rows
+    """
+
+    def __init__(self, path, loader, initial=None, candidate_path=None,
+                 poll_interval=5.0, threshold=650, report_every=100):
+        self.path = path
+        self.loader = loader
+        self.candidate_path = candidate_path
+        self.poll_interval = poll_interval
+        self.report_every = report_every
+        self.metrics = ShadowMetrics(threshold)
+
+        self._lock = threading.Lock()
+        self.live = initial
+        self.live_version = file_version(path) if initial is not None else None
+        self._pending = None  # (model, version)
+        self.candidate = None
+        self.candidate_version = None
+        self._rejected = {}  # path -> version the loader returned None for
+
+        self._stop = threading.Event()
+        self._watcher = None
+        # One worker: shadow scoring is best-effort and must never pile up threads
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+        self._shadow_inflight = threading.Semaphore(2)
+
+    # ---- watching ----
+
+    def start(self):
+        """
+        Start the background watcher thread (idempotent)
+        """
+        if self._watcher is None:
+            self.check()
+            self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+            self._watcher.start()
+            print(f"👀 Watching {self.path} for new model versions"
+                  + (f" (shadow candidate: {self.candidate_path})" if self.candidate_path else ""))
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠️ Model watcher error: {e}")
+
+    def _load(self, path, version):
+        """
+        Load a version not seen before; a rejected version is not retried
+        until the file changes again
+        """
+        if version is None or self._rejected.get(path) == version:
+            return None
+        model = self.loader(path)
+        if model is None:
+            self._rejected[path] = version
+        return model
+
+    def check(self):
+        """
+        Load any new live/candidate version found on disk (runs off the request path)
+        """
+        version = file_version(self.path)
+        with self._lock:
+            known = self._pending[1] if self._pending else self.live_version
+        if version != known:
+            model = self._load(self.path, version)
+            # Re-stat: if the file changed while loading, pick it up next round
+            if model is not None and file_version(self.path) == version:
+                with self._lock:
+                    self._pending = (model, version)
+                print(f"📦 New model version staged from {self.path}")
+
+        if self.candidate_path:
+            version = file_version(self.candidate_path)
+            if version != self.candidate_version:
+                model = self._load(self.candidate_path, version)
+                if model is not None:
+                    with self._lock:
+                        self.candidate = model
+                        self.candidate_version = version
+                    self.metrics.reset()
+                    print(f"🧪 Shadow candidate loaded from {self.candidate_path}")
+
+    # ---- swapping ----
+
+    def apply_pending(self):
+        """
+        Swap in a staged model; call between batches. Returns the new model or None
+        """
+        with self._lock:
+            if self._pending is None:
+                return None
+            self.live, self.live_version = self._pending
+            self._pending = None
+            model = self.live
+        print(f"🔄 Live model swapped (version {self.live_version[0]})")
+        return model
+
+    # ---- shadow scoring ----
+
+    def shadow(self, features, live_scores, live_ms):
+        """
+        Score `features` with the candidate in the background and record the diff
+        """
+        with self._lock:
+            candidate = self.candidate
+        if candidate is None:
+            return
+        if not self._shadow_inflight.acquire(blocking=False):
+            return  # shadow is falling behind; skip rather than queue
+        self._shadow_pool.submit(self._run_shadow, candidate, features, list(live_scores), live_ms)
+
+    def _run_shadow(self, candidate, features, live_scores, live_ms):
+        try:
+            started = time.perf_counter()
+            shadow_scores = candidate.predict(features)
+            shadow_ms = (time.perf_counter() - started) * 1000
+            before = self.metrics.rows
+            self.metrics.record(live_scores, shadow_scores, live_ms, shadow_ms)
+            if before // self.report_every != self.metrics.rows // self.report_every:
+                print(f"🧪 Shadow metrics: {self.metrics.snapshot()}")
+        except Exception as e:
+            self.metrics.record_error()
+            print(f"⚠️ Shadow scoring error: {e}")
+        finally:
+            self._shadow_inflight.release()
+
+    def status(self):
+        with self._lock:
+            return {
+                'live_version': self.live_version,
+                'pending': self._pending is not None,
+                'candidate_version': self.candidate_version,
+                'shadow': self.metrics.snapshot() if self.candidate is not None else None,
+            }
@@ -11,6 +11,10 @@ Dependencies:
 - requests: HTTP calls for price data
 - scikit-learn: ML models
 - numpy: Numerical computation
+
+RPC and CoinGecko calls go through a resilience.Dependency with a
+deadline and circuit breaker, and receipt waits are capped at
+RECEIPT_TIMEOUT, so a hung dependency cannot stall the event loop.
 """
 
 from web3 import Web3
@@ -18,11 +22,18 @@ from eth_account import Account
 import json
 import time
 import os
-import requests
-import numpy as np
-import pickle
-import pandas as pd
 from dotenv import load_dotenv
+import scoring
+from scoring import (
+    APPROVAL_THRESHOLD, check_social_media_links, fetch_eth_rates, interest_for_loan_value,
+    load_ml_model, simulated_days_active
+)
+from resilience import (
+    TRANSPORT_ERRORS, CircuitBreaker, CircuitOpenError, Dependency, PriorityWorkQueue, backoff_delay
+)
+from provider_pool import PooledHTTPProvider
+from model_registry import ModelRegistry
+from records import RequestHistory, STATUS_CONFIRMED, STATUS_DEFERRED, STATUS_FAILED
 
 load_dotenv()
 
@@ -33,7 +44,7 @@ def load_config():
     Load configuration from environment variables
     
     REQUIREMENTS:
-    - Load RPC_URL for Ethereum node connection
+    - Load RPC_URL for Ethereum node connection (comma-separated for a node pool)
     - Load PRIVATE_KEY for oracle wallet
     - Load CONTRACT_ADDRESS for deployed LendingOracle
     - Validate all required vars are present
@@ -69,14 +80,42 @@ except ValueError as e:
     # In a real app we might exit, but for now let's just print
     exit(1)
 
+# Optional tuning (seconds / counts)
+RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '5'))
+RPC_HEDGE_DELAY = float(os.getenv('RPC_HEDGE_DELAY', '0.15'))
+PRICE_TIMEOUT = float(os.getenv('PRICE_TIMEOUT', '3'))
+RECEIPT_TIMEOUT = float(os.getenv('RECEIPT_TIMEOUT', '30'))
+POLL_INTERVAL = float(os.getenv('POLL_INTERVAL', '2'))
+MAX_PENDING_EVENTS = int(os.getenv('MAX_PENDING_EVENTS', '1000'))
+LOG_BLOCK_RANGE = int(os.getenv('LOG_BLOCK_RANGE', '1000'))  # max blocks per eth_getLogs poll
+MODEL_PATH = os.getenv('MODEL_PATH', 'credit_model.pkl')
+SHADOW_MODEL_PATH = os.getenv('SHADOW_MODEL_PATH')  # candidate to shadow-score, optional
+MODEL_POLL_INTERVAL = float(os.getenv('MODEL_POLL_INTERVAL', '5'))
+HISTORY_CAPACITY = int(os.getenv('HISTORY_CAPACITY', '100000'))
+HISTORY_REPORT_EVERY = int(os.getenv('HISTORY_REPORT_EVERY', '100'))  # print history summary every N requests
+
+# ============= EXTERNAL DEPENDENCIES =============
+
+# Reads (eth_getLogs ranges included) are safe to retry; transaction sends pass retries=0
+rpc = Dependency('rpc', timeout=RPC_TIMEOUT, retries=2, failure_types=TRANSPORT_ERRORS)
+price_api = Dependency('coingecko', timeout=PRICE_TIMEOUT, failure_threshold=3, reset_timeout=60.0)
+
 # ============= BLOCKCHAIN CONNECTION =============
 
 def initialize_web3(rpc_url):
     """
     Initialize Web3 instance and verify connection
+    
+    A comma-separated rpc_url uses a PooledHTTPProvider: reads are routed
+    to the fastest healthy node (and hedged), writes stay on the first.
     """
     try:
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        urls = [u.strip() for u in rpc_url.split(',') if u.strip()]
+        if len(urls) > 1:
+            provider = PooledHTTPProvider(urls, timeout=RPC_TIMEOUT, hedge_delay=RPC_HEDGE_DELAY)
+        else:
+            provider = Web3.HTTPProvider(rpc_url, request_kwargs={'timeout': RPC_TIMEOUT})
+        w3 = Web3(provider)
         if not w3.is_connected():
             raise ConnectionError(f"Failed to connect to Ethereum node at {rpc_url}")
         print(f"✅ Connected to Ethereum node at {rpc_url}")
@@ -186,38 +225,6 @@ except Exception as e:
 
 # ============= OFF-CHAIN VALIDATION (PHASE 4) =============
 
-def check_social_media_links(ens_name):
-    """
-    Check if ENS domain has social media text records
-    """
-    print(f"🔍 Checking social media for {ens_name}...")
-    
-    if not ens_name:
-        print("   No ENS provided. Skipping social check.")
-        return {
-            'linked': False,
-            'platforms': [],
-            'details': {}
-        }
-    
-    # Mock Implementation for MVP
-    # In production, we would query the ENS Text Records
-    # Simulating a random probability of having valid social links
-    is_linked = np.random.random() > 0.6  # 40% chance of success
-    
-    platforms = []
-    if is_linked:
-        platforms = ['com.twitter', 'com.github']
-        print(f"   Found linked platforms: {', '.join(platforms)}")
-    else:
-        print("   No social media links found.")
-        
-    return {
-        'linked': is_linked,
-        'platforms': platforms,
-        'details': {}
-    }
-
 def get_eth_to_inr_price(amount_wei):
     """
     Fetch current ETH/INR price and calculate loan value
@@ -231,29 +238,17 @@ def get_eth_to_inr_price(amount_wei):
         
         # Try fetching from CoinGecko
         try:
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=inr,usd"
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if 'ethereum' in data:
-                    eth_to_inr = data['ethereum']['inr']
-                    eth_to_usd = data['ethereum']['usd']
-                    print(f"   Current Rate: ₹{eth_to_inr} / ETH")
+            rates = fetch_eth_rates(PRICE_TIMEOUT, price_api)
+            if rates is not None:
+                eth_to_inr, eth_to_usd = rates
+                print(f"   Current Rate: ₹{eth_to_inr} / ETH")
         except Exception as api_err:
             print(f"   ⚠️ API Error: {api_err}. Using mock rate ₹{eth_to_inr}")
 
         # Calculations
         amount_eth = float(w3.from_wei(amount_wei, 'ether'))
         loan_value_inr = amount_eth * eth_to_inr
-        
-        # Interest Rate Logic
-        base_interest = 12.0 # Default
-        if loan_value_inr > 1000000: # > 10 Lakh
-            base_interest = 8.0
-        elif loan_value_inr > 500000: # > 5 Lakh
-            base_interest = 10.0
-        elif loan_value_inr > 100000: # > 1 Lakh
-            base_interest = 11.0
+        base_interest = interest_for_loan_value(loan_value_inr)
             
         print(f"   Loan Value: ₹{loan_value_inr:,.2f} -> Interest Rate: {base_interest}%")
             
@@ -274,38 +269,34 @@ def get_eth_to_inr_price(amount_wei):
 
 # ============= AI/ML SETUP =============
 
-def load_ml_model(model_path='credit_model.pkl'):
+# Load model globally
+ml_model = load_ml_model(MODEL_PATH)
+
+# New versions of MODEL_PATH are loaded in the background and swapped in
+# by swap_model() between batches (watcher started by event_loop)
+model_registry = ModelRegistry(
+    MODEL_PATH, load_ml_model, initial=ml_model, candidate_path=SHADOW_MODEL_PATH,
+    poll_interval=MODEL_POLL_INTERVAL, threshold=APPROVAL_THRESHOLD
+)
+
+def swap_model():
     """
-    Load pre-trained ML model for credit scoring
+    Adopt a staged model version, if any; only call between batches
     """
-    try:
-        if not os.path.exists(model_path):
-            print(f"⚠️ Model file not found at {model_path}. Using rule-based fallback.")
-            return None
-            
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-            
-        if not hasattr(model, 'predict'):
-            print("⚠️ Loaded object is not a valid model (missing predict method).")
-            return None
-            
-        print(f"✅ AI Model loaded from {model_path}")
-        return model
-    except Exception as e:
-        print(f"❌ Model Load Error: {e}")
-        return None
-
-# Load model globally
-ml_model = load_ml_model()
+    global ml_model
+    new_model = model_registry.apply_pending()
+    if new_model is not None:
+        ml_model = new_model
 
 # ============= MAIN LOGIC =============
 
-def compute_credit_score(ens_name, loan_data, social_data, borrower_address, test_balance_wei=None):
+# Fixed-size history of processed requests (see records.py)
+request_history = RequestHistory(HISTORY_CAPACITY)
+
+def gather_features(loan_data, social_data, borrower_address, test_balance_wei=None):
     """
-    Combine signals into a credit score using ML model
+    Collect the model features for a borrower
     """
-    # 1. Gather Features
     # Since we can't easily get real tx history without an indexer like The Graph,
     # we will simulate fetching additional on-chain data or use available proxies.
     
@@ -315,66 +306,65 @@ def compute_credit_score(ens_name, loan_data, social_data, borrower_address, tes
         print(f"   Using Test Balance: {balance_eth} ETH")
     else:
         try:
-            balance_wei = w3.eth.get_balance(borrower_address)
+            balance_wei = rpc.call(w3.eth.get_balance, borrower_address)
             balance_eth = float(w3.from_wei(balance_wei, 'ether'))
+        except CircuitOpenError:
+            # Node is down: defer the request rather than score it with zeros
+            raise
         except:
             balance_eth = 0.0
         
     # Feature: Tx Count (using nonce as proxy)
     try:
-        tx_count = w3.eth.get_transaction_count(borrower_address)
+        tx_count = rpc.call(w3.eth.get_transaction_count, borrower_address)
+    except CircuitOpenError:
+        raise
     except:
         tx_count = 0
         
-    # Feature: Days Active (Simulated for MVP)
-    # Ideally: (now - first_tx_timestamp) / 86400
-    days_active = np.random.randint(100, 1000) 
-    
-    # Feature: Social (Binary)
-    has_social = 1 if social_data['linked'] else 0
-    
-    # Feature: Loan Value
-    loan_value_inr = loan_data['loan_value_inr']
-    
-    # Try ML Prediction
-    if ml_model:
-        # CHEAT CODE FOR TESTING:
-        if ens_name and 'ether' in ens_name.lower():
-            print("🌟 VIP User Detected! Bypass AI check.")
-            return 850
-        if ens_name and 'sample' in ens_name.lower():
-            print("🌟 VIP User Detected! Bypass AI check.")
-            return 500
+    return {
+        'balance_eth': balance_eth,
+        'tx_count': tx_count,
+        # Feature: Days Active (Simulated for MVP)
+        'days_active': simulated_days_active(),
+        # Feature: Social (Binary)
+        'has_social': 1 if social_data['linked'] else 0,
+        # Feature: Loan Value
+        'loan_value_inr': loan_data['loan_value_inr']
+    }
 
-        try:
-            # Create DataFrame for prediction (must match training columns)
-            features = pd.DataFrame([{
-                'balance_eth': balance_eth,
-                'tx_count': tx_count,
-                'days_active': days_active,
-                'has_social': has_social,
-                'loan_value_inr': loan_value_inr
-            }])
-            
-            prediction = ml_model.predict(features)[0]
-            print(f"🧠 AI Model Prediction: {prediction:.2f}")
-            return int(prediction)
-        except Exception as e:
-            print(f"⚠️ Prediction Error: {e}. Falling back to rules.")
-
-    # Fallback Rule-Based Logic
-    print("ℹ️ Using Rule-Based Scoring Fallback")
-    score = 600
-    if has_social: score += 50
-    if balance_eth > 1.0: score += 50
-    if tx_count > 10: score += 30
+def score_features_batch(ens_names, feature_rows, model=None):
+    """
+    Score many feature rows with the live model (see scoring.score_features_batch)
     
-    return min(850, max(300, int(score)))
+    Rows scored by the live model are shadow-scored by the registry's
+    candidate, if one is loaded.
+    """
+    is_live = model is None
+    return scoring.score_features_batch(
+        ens_names, feature_rows, ml_model if is_live else model,
+        on_predict=model_registry.shadow if is_live else None, verbose=True
+    )
+
+def score_features(ens_name, features, model=None):
+    """
+    Score a single feature row (see score_features_batch)
+    """
+    return score_features_batch([ens_name], [features], model)[0]
+
+def compute_credit_score(ens_name, loan_data, social_data, borrower_address, test_balance_wei=None):
+    """
+    Combine signals into a credit score using ML model
+    """
+    features = gather_features(loan_data, social_data, borrower_address, test_balance_wei)
+    return score_features(ens_name, features)
 
 def handle_loan_request(event):
     """
     Process a loan request event
     """
+    received_at = time.time()
+    started = time.perf_counter()
     args = event['args']
     request_id = args['requestId']
     borrower = args['borrower']
@@ -398,11 +388,12 @@ def handle_loan_request(event):
     loan_data = get_eth_to_inr_price(amount)
     
     # 3. AI Scoring (Phase 5)
-    credit_score = compute_credit_score(ens_name, loan_data, social_data, borrower, test_balance)
+    features = gather_features(loan_data, social_data, borrower, test_balance)
+    credit_score = score_features(ens_name, features)
     print(f"🎯 Final Credit Score: {credit_score}")
     
     # 4. Decision
-    approved = credit_score >= 650
+    approved = credit_score >= APPROVAL_THRESHOLD
     interest_rate_bps = int(loan_data['base_interest'] * 100)
     
     if approved:
@@ -410,12 +401,33 @@ def handle_loan_request(event):
     else:
         print(f"LOAN REJECTED")
         
+    handle = request_history.append(
+        request_id, borrower, amount, features, credit_score, interest_rate_bps, approved,
+        received_at=received_at, latency_ms=(time.perf_counter() - started) * 1000,
+        debug=test_balance is not None
+    )
+        
     # 5. Submit to Blockchain (Phase 3/2)
-    submit_fulfillment(request_id, credit_score, interest_rate_bps, approved)
+    try:
+        confirmed = submit_fulfillment(request_id, credit_score, interest_rate_bps, approved)
+    except CircuitOpenError:
+        # Requeued by drain_queue; the retry is recorded as a new row
+        request_history.set_status(handle, STATUS_DEFERRED)
+        raise
+    request_history.set_status(handle, STATUS_CONFIRMED if confirmed else STATUS_FAILED)
+    
+    if HISTORY_REPORT_EVERY > 0 and (handle + 1) % HISTORY_REPORT_EVERY == 0:
+        print(f"📒 Request history: {request_history.summary()}")
 
 def submit_fulfillment(request_id, credit_score, interest_rate_bps, approved):
     """
     Send transaction to fulfill request
+    
+    RETURNS:
+        bool: True if the fulfillment transaction was confirmed
+    
+    RAISES:
+        CircuitOpenError: If the node is down and nothing was sent
     """
     try:
         print(" Submitting fulfillment to blockchain...")
@@ -428,59 +440,138 @@ def submit_fulfillment(request_id, credit_score, interest_rate_bps, approved):
             approved
         ).build_transaction({
             'from': oracle_account.address,
-            'nonce': w3.eth.get_transaction_count(oracle_account.address),
+            'nonce': rpc.call(w3.eth.get_transaction_count, oracle_account.address),
             # Gas estimation can be tricky, using hardcoded output from hardhat usually safe for dev
             'gas': 2000000, 
-            'gasPrice': w3.eth.gas_price
+            'gasPrice': rpc.call(lambda: w3.eth.gas_price)
         })
         
         # Sign transaction
         signed_tx = w3.eth.account.sign_transaction(tx, config['private_key'])
         
         # Send transaction
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = rpc.call(w3.eth.send_raw_transaction, signed_tx.raw_transaction, retries=0)
         print(f"🚀 Transaction sent: {tx_hash.hex()}")
         
-        # Wait for receipt
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        # Wait for receipt (bounded; raises TimeExhausted after RECEIPT_TIMEOUT)
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=RECEIPT_TIMEOUT)
         if receipt.status == 1:
             print("Transaction confirmed!")
-        else:
-            print(" Transaction failed!")
+            return True
+        print(" Transaction failed!")
+        return False
             
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Submission Error: {e}")
+        return False
 
 # ============= EVENT LISTENING =============
 
+def poll_events(sources, from_block, work_queue):
+    """
+    Fetch logs for each (event, low_priority) pair into the work queue
+    
+    Uses eth_getLogs over an explicit block range rather than node-side
+    filters: the range can be re-read after a timeout or on another node,
+    so nothing is lost if a poll fails half way. Logs are only enqueued
+    once every source has been read.
+    
+    Logs are enqueued block by block. If a block's LoanRequested logs do
+    not all fit in the queue, polling stops there and that block is read
+    again next time; only debug requests are ever shed.
+    
+    RETURNS:
+        int: The block to poll from next time
+    """
+    head = rpc.call(lambda: w3.eth.block_number)
+    if from_block is None:
+        # First poll: only requests made from now on, like a 'latest' filter
+        return head + 1
+    if from_block > head:
+        return from_block
+    
+    to_block = min(head, from_block + LOG_BLOCK_RANGE - 1)
+    batches = [
+        (rpc.call(event.get_logs, from_block=from_block, to_block=to_block), low_priority)
+        for event, low_priority in sources
+    ]
+    blocks = {}
+    for logs, low_priority in batches:
+        for event in logs:
+            blocks.setdefault(event['blockNumber'], []).append((event, low_priority))
+    
+    for block in sorted(blocks):
+        entries = sorted(blocks[block], key=lambda entry: entry[0].get('logIndex', 0))
+        if not work_queue.accepts(sum(1 for _, low_priority in entries if not low_priority)):
+            print(f"⚠️ Backpressure: deferring requests from block {block} "
+                  f"({len(work_queue)} pending)")
+            return block
+        for event, low_priority in entries:
+            if not work_queue.put(event, low_priority):
+                print(f"⚠️ Backpressure: shed debug request {event['args']['requestId'].hex()} "
+                      f"({len(work_queue)} pending)")
+    return to_block + 1
+
+def drain_queue(work_queue, slice_end):
+    """
+    Handle queued requests until the queue is empty or slice_end is reached
+    
+    Stops while the RPC circuit is open: queued requests are kept (and one
+    interrupted by the breaker is put back) until the node recovers.
+    """
+    while len(work_queue) and time.monotonic() < slice_end:
+        if rpc.breaker.state == CircuitBreaker.OPEN:
+            print(f"⏸️ RPC circuit open; holding {len(work_queue)} pending request(s)")
+            return
+        event = work_queue.get()
+        try:
+            handle_loan_request(event)
+        except CircuitOpenError:
+            work_queue.requeue(event, low_priority='testBalanceEth' in event['args'])
+        except Exception as e:
+            print(f"Request Error: {e}")
+
 def event_loop():
     """
     Main loop to poll for events
+    
+    Real LoanRequested events are high priority; DebugLoanRequested events
+    are deferred behind them and shed first when the backlog grows. New
+    events are polled every POLL_INTERVAL even while a backlog is draining.
     """
     print(f"\n🎧 Listening for LoanRequested events on {config['contract_address']}...")
     
-    # Create filters for both normal and debug events
-    loan_filter = lending_contract.events.LoanRequested.create_filter(from_block='latest')
-    debug_filter = lending_contract.events.DebugLoanRequested.create_filter(from_block='latest')
+    # Poll both normal and debug events
+    sources = [
+        (lending_contract.events.LoanRequested, False),
+        (lending_contract.events.DebugLoanRequested, True)
+    ]
+    
+    work_queue = PriorityWorkQueue(maxsize=MAX_PENDING_EVENTS)
+    next_block = None
+    poll_failures = 0
+    model_registry.start()
     
     while True:
         try:
-            # Check both event types
-            new_entries = loan_filter.get_new_entries()
-            debug_entries = debug_filter.get_new_entries()
+            next_block = poll_events(sources, next_block, work_queue)
+            poll_failures = 0
+            swap_model()
             
-            for event in new_entries:
-                handle_loan_request(event)
-            for event in debug_entries:
-                handle_loan_request(event)
+            slice_end = time.monotonic() + POLL_INTERVAL
+            drain_queue(work_queue, slice_end)
                 
-            time.sleep(2)
+            time.sleep(max(0.0, slice_end - time.monotonic()))
         except KeyboardInterrupt:
             print("\nOracle stopped by user")
             break
         except Exception as e:
-            print(f"Polling Error: {e}")
-            time.sleep(2)
+            poll_failures += 1
+            delay = POLL_INTERVAL + backoff_delay(poll_failures, base=POLL_INTERVAL, cap=30.0)
+            print(f"Polling Error: {e}. Retrying in {delay:.1f}s")
+            time.sleep(delay)
 
 if __name__ == "__main__":
     event_loop()
@@ -0,0 +1,232 @@
+"""
+Multi-endpoint JSON-RPC pool for the oracle
+
+Spreads the oracle's RPC traffic over several Ethereum nodes instead of
+binding it to a single HTTPProvider:
+
+- Each endpoint keeps its own keep-alive connection pool (requests.Session)
+- Reads go to the healthy endpoint with the lowest measured latency (EWMA)
+  and are hedged: if no answer arrives within `hedge_delay`, the same call
+  is sent to the next-fastest endpoint and the first reply wins
+- Writes, nonce queries, receipts and the oracle's log polling
+  (eth_blockNumber + eth_getLogs) are pinned to one "sticky" endpoint so
+  nonces stay consistent and logs are never requested beyond the head of
+  the node that serves them; it moves down the list when that endpoint's
+  circuit breaker opens and fails back to the first endpoint once it
+  recovers
+- Endpoint health uses resilience.CircuitBreaker, so a failed node is
+  probed again after its reset timeout instead of being dropped forever;
+  a half-open node gets a single probe call, not its full share of reads
+
+NOTE: node-side filters (eth_newFilter) live on the node that created
+them and do not survive a sticky failover; the oracle polls eth_getLogs
+over block ranges instead.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import providers
+
+from resilience import CircuitBreaker
+
+# Methods that depend on node-local state or on read-your-writes
+PINNED_METHODS = frozenset({
+    'eth_blockNumber',
+    'eth_getLogs',
+    'eth_sendRawTransaction',
+    'eth_sendTransaction',
+    'eth_getTransactionCount',
+    'eth_getTransactionReceipt',
+    'eth_newFilter',
+    'eth_newBlockFilter',
+    'eth_newPendingTransactionFilter',
+    'eth_getFilterChanges',
+    'eth_getFilterLogs',
+    'eth_uninstallFilter',
+})
+
+class RPCEndpoint:
+    """
+    One node: a persistent HTTP session plus latency and health tracking
+    """
+
+    def __init__(self, url, timeout=5.0, pool_size=8, ewma_alpha=0.3):
+        self.url = url
+        self.timeout = timeout
+        self.ewma_alpha = ewma_alpha
+        self.latency = None  # seconds, EWMA of successful calls
+        self.breaker = CircuitBreaker(url, failure_threshold=3, reset_timeout=10.0)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        latency = 'n/a' if self.latency is None else f"{self.latency * 1000:.1f}ms"
+        return f"RPCEndpoint({self.url}, {latency}, {self.breaker.state})"
+
+    def record_latency(self, seconds):
+        with self._lock:
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency = self.ewma_alpha * seconds + (1 - self.ewma_alpha) * self.latency
+
+    def request(self, payload):
+        """
+        POST a JSON-RPC payload and return the decoded response
+
+        A JSON-RPC error object is a valid answer from a healthy node;
+        only transport failures count against the endpoint (the same split
+        as resilience.TRANSPORT_ERRORS).
+        """
+        started = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            result = response.json()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.record_latency(time.perf_counter() - started)
+        self.breaker.record_success()
+        return result
+
+class EndpointPool:
+    """
+    Latency-aware routing, hedged reads and pinned writes over RPCEndpoints
+    """
+
+    def __init__(self, urls, timeout=5.0, hedge_delay=0.15, max_hedges=1):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one RPC URL")
+        self.endpoints = [RPCEndpoint(url, timeout) for url in urls]
+        self.hedge_delay = hedge_delay
+        self.max_hedges = max_hedges
+        self._sticky = self.endpoints[0]
+        self._sticky_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=4 * len(self.endpoints), thread_name_prefix='rpc-pool'
+        )
+
+    # ---- routing ----
+
+    def ranked(self):
+        """
+        Healthy endpoints, fastest first; unmeasured ones are tried early
+        so every node gets a latency sample
+
+        A recovering (half-open) endpoint is put first only when its breaker
+        grants a probe, so it gets exactly one call rather than full traffic.
+        """
+        healthy = sorted(
+            (ep for ep in self.endpoints if ep.breaker.state == CircuitBreaker.CLOSED),
+            key=lambda ep: -1.0 if ep.latency is None else ep.latency
+        )
+        for ep in self.endpoints:
+            if ep.breaker.state == CircuitBreaker.HALF_OPEN and ep.breaker.allow():
+                return [ep] + healthy
+        if not healthy:
+            # Everything is down: still try, fastest-known first
+            return sorted(self.endpoints, key=lambda ep: -1.0 if ep.latency is None else ep.latency)
+        return healthy
+
+    def _recovered(self, ep):
+        """
+        True if ep's breaker is closed, or a half-open probe call succeeds
+        """
+        if ep.breaker.state == CircuitBreaker.HALF_OPEN and ep.breaker.allow():
+            try:
+                ep.request({'jsonrpc': '2.0', 'method': 'eth_blockNumber', 'params': [], 'id': next(self._ids)})
+            except Exception:
+                return False
+        return ep.breaker.state == CircuitBreaker.CLOSED
+
+    def sticky(self):
+        """
+        The endpoint writes are pinned to; fails over in configured order
+        and fails back to the first endpoint once it has recovered
+        """
+        with self._sticky_lock:
+            primary = self.endpoints[0]
+            if self._sticky is not primary and self._recovered(primary):
+                print(f"✅ RPC write endpoint failback: {self._sticky.url} -> {primary.url}")
+                self._sticky = primary
+            if self._sticky.breaker.state == CircuitBreaker.OPEN:
+                for ep in self.endpoints:
+                    if ep.breaker.state == CircuitBreaker.CLOSED:
+                        print(f"⚠️ RPC write endpoint failover: {self._sticky.url} -> {ep.url}")
+                        self._sticky = ep
+                        break
+            return self._sticky
+
+    # ---- requests ----
+
+    def make_request(self, method, params):
+        payload = {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': next(self._ids)}
+        if method in PINNED_METHODS:
+            return self.sticky().request(payload)
+        return self._hedged(payload, self.ranked())
+
+    def _hedged(self, payload, candidates):
+        pending = {}
+        errors = []
+        next_idx = 0
+        hedges = 0
+
+        def launch():
+            nonlocal next_idx
+            ep = candidates[next_idx]
+            next_idx += 1
+            pending[self._executor.submit(ep.request, payload)] = ep
+
+        launch()
+        while pending:
+            can_hedge = next_idx < len(candidates) and hedges < self.max_hedges
+            done, _ = wait(pending, timeout=self.hedge_delay if can_hedge else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                hedges += 1
+                launch()
+                continue
+            for future in done:
+                ep = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{ep.url}: {e}")
+                    # A hard failure moves straight on to the next endpoint
+                    if next_idx < len(candidates):
+                        launch()
+        raise ConnectionError(f"All RPC endpoints failed: {'; '.join(errors)}")
+
+    def is_connected(self):
+        try:
+            return 'result' in self.make_request('web3_clientVersion', [])
+        except Exception:
+            return False
+
+class PooledHTTPProvider(providers.BaseProvider):
+    """
+    web3.py provider backed by an EndpointPool
+    """
+
+    def __init__(self, urls, timeout=5.0, hedge_delay=0.15):
+        super().__init__()
+        self.pool = EndpointPool(urls, timeout=timeout, hedge_delay=hedge_delay)
+
+    def __str__(self):
+        return f"PooledHTTPProvider({', '.join(ep.url for ep in self.pool.endpoints)})"
+
+    def make_request(self, method, params):
+        return self.pool.make_request(method, params)
+
+    def is_connected(self, show_traceback=False):
+        return self.pool.is_connected()
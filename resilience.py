@@ -0,0 +1,270 @@
+"""
+Resilience primitives for the oracle's external dependencies
+
+The oracle runs a single polling thread, so one hung call (CoinGecko,
+an RPC read, a receipt wait) stalls every loan behind it. This module
+provides the pieces used to keep tail latency bounded:
+
+- call_with_deadline: run a blocking call with a hard wall-clock limit
+- CircuitBreaker: fail fast after repeated failures, probe to recover
+- RetryBudget / backoff_delay: jittered retries capped to a fraction of traffic
+- Dependency: the three combined, one instance per external dependency
+- PriorityWorkQueue: bounded queue that sheds low-priority work when full
+"""
+
+import collections
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# ============= ERRORS =============
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not finish within its deadline"""
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the dependency's breaker is open"""
+
+# Errors that say the dependency itself is unhealthy: connection and HTTP
+# failures (requests' exceptions are IOErrors) and DeadlineExceeded are all
+# OSError subclasses. Application errors, such as a JSON-RPC "nonce too low"
+# or a revert, are answers from a healthy dependency.
+TRANSPORT_ERRORS = (OSError,)
+
+# ============= DEADLINES =============
+
+# Calls that overrun their deadline keep running in the background, so the
+# pool is bounded: once every worker is stuck, new calls wait in the pool's
+# queue and still time out on schedule instead of spawning more threads.
+_deadline_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='deadline')
+
+def call_with_deadline(fn, timeout, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) and give up after `timeout` seconds
+
+    RAISES:
+        DeadlineExceeded: If fn has not returned in time
+    """
+    if timeout is None:
+        return fn(*args, **kwargs)
+    future = _deadline_pool.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise DeadlineExceeded(f"{getattr(fn, '__name__', 'call')} exceeded {timeout}s deadline")
+
+# ============= CIRCUIT BREAKER =============
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    Open -> half-open once `reset_timeout` seconds have passed; up to
+    `half_open_max` probe calls are let through. A successful probe closes
+    the breaker, a failed one re-opens it for another `reset_timeout`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, half_open_max=1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self):
+        """
+        Reserve permission for one call; False means fail fast
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_max:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                print(f"✅ Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"⚠️ Circuit '{self.name}' opened after {self._failures} failure(s)")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+# ============= RETRIES =============
+
+def backoff_delay(attempt, base=0.1, cap=2.0):
+    """
+    Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class RetryBudget:
+    """
+    Token bucket that limits retries to roughly `ratio` of successful calls
+
+    Stops a struggling dependency from being hammered by retry storms:
+    every success deposits `ratio` tokens (up to `max_tokens`), every retry
+    withdraws one.
+    """
+
+    def __init__(self, ratio=0.2, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self):
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+# ============= DEPENDENCY =============
+
+class Dependency:
+    """
+    Deadline + circuit breaker + budgeted retries for one external dependency
+
+    Only exceptions matching `failure_types` count against the breaker and
+    are retried. Anything else is an answer from a healthy dependency
+    (e.g. a JSON-RPC "nonce too low" or a revert) and is raised to the
+    caller straight away.
+    """
+
+    def __init__(self, name, timeout, retries=0, failure_threshold=5, reset_timeout=30.0, retry_budget=None,
+                 failure_types=(Exception,)):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.failure_types = failure_types
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.budget = retry_budget or RetryBudget()
+
+    def call(self, fn, *args, retries=None, **kwargs):
+        """
+        Call fn through the breaker with a per-attempt deadline
+
+        RAISES:
+            CircuitOpenError: If the breaker is open
+            Exception: The last failure once retries or the retry budget run out;
+                any other error is raised at once
+        """
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            try:
+                result = call_with_deadline(fn, self.timeout, *args, **kwargs)
+            except self.failure_types:
+                self.breaker.record_failure()
+                if attempt >= retries or not self.budget.try_withdraw():
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            self.budget.deposit()
+            return result
+
+# ============= BACKPRESSURE =============
+
+class PriorityWorkQueue:
+    """
+    Bounded two-level queue: high-priority items are always served first
+
+    - Low-priority items are shed once the queue holds `low_watermark` items,
+      so they never crowd out real work.
+    - When the queue is at `maxsize`, a high-priority item evicts the oldest
+      low-priority one; if there is none, the new item is rejected.
+    """
+
+    def __init__(self, maxsize=100, low_watermark=None):
+        self.maxsize = maxsize
+        self.low_watermark = maxsize // 2 if low_watermark is None else low_watermark
+        self._high = collections.deque()
+        self._low = collections.deque()
+        self.shed = 0
+
+    def __len__(self):
+        return len(self._high) + len(self._low)
+
+    def put(self, item, low_priority=False):
+        """
+        Enqueue an item; returns False if it (or nothing) could be accepted
+        """
+        if low_priority:
+            if len(self) >= self.low_watermark:
+                self.shed += 1
+                return False
+            self._low.append(item)
+            return True
+
+        if len(self) >= self.maxsize:
+            if not self._low:
+                self.shed += 1
+                return False
+            self._low.popleft()
+            self.shed += 1
+        self._high.append(item)
+        return True
+
+    def accepts(self, count):
+        """
+        True if `count` high-priority items fit without rejecting any
+        (low-priority items may be evicted to make room)
+        """
+        return len(self._high) + count <= self.maxsize
+
+    def get(self):
+        """
+        Pop the next item (high priority first); IndexError if empty
+        """
+        if self._high:
+            return self._high.popleft()
+        return self._low.popleft()
+
+    def requeue(self, item, low_priority=False):
+        """
+        Put a just-popped item back at the head of its level (never shed)
+        """
+        (self._low if low_priority else self._high).appendleft(item)
@@ -0,0 +1,209 @@
+"""
+Credit scoring core shared by the oracle and the scoring service
+
+Pure scoring pieces with no import-time side effects: no configuration,
+no node connection, no signing key. oracle.py wraps these with its
+on-chain feature gathering; scoring_service.py serves them over HTTP.
+"""
+
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+# Minimum credit score for approval
+APPROVAL_THRESHOLD = 650
+
+# Column order used at training time (scripts/train_model.py)
+FEATURE_COLUMNS = ['balance_eth', 'tx_count', 'days_active', 'has_social', 'loan_value_inr']
+
+COINGECKO_URL = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=inr,usd"
+
+# ============= MODEL =============
+
+def load_ml_model(model_path='credit_model.pkl'):
+    """
+    Load pre-trained ML model for credit scoring
+    """
+    try:
+        if not os.path.exists(model_path):
+            print(f"⚠️ Model file not found at {model_path}. Using rule-based fallback.")
+            return None
+
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+
+        if not hasattr(model, 'predict'):
+            print("⚠️ Loaded object is not a valid model (missing predict method).")
+            return None
+
+        print(f"✅ AI Model loaded from {model_path}")
+        return model
+    except Exception as e:
+        print(f"❌ Model Load Error: {e}")
+        return None
+
+# ============= OFF-CHAIN SIGNALS =============
+
+def check_social_media_links(ens_name, verbose=True):
+    """
+    Check if ENS domain has social media text records
+    """
+    if verbose:
+        print(f"🔍 Checking social media for {ens_name}...")
+
+    if not ens_name:
+        if verbose:
+            print("   No ENS provided. Skipping social check.")
+        return {
+            'linked': False,
+            'platforms': [],
+            'details': {}
+        }
+
+    # Mock Implementation for MVP
+    # In production, we would query the ENS Text Records
+    # Simulating a random probability of having valid social links
+    is_linked = np.random.random() > 0.6  # 40% chance of success
+
+    platforms = []
+    if is_linked:
+        platforms = ['com.twitter', 'com.github']
+        if verbose:
+            print(f"   Found linked platforms: {', '.join(platforms)}")
+    elif verbose:
+        print("   No social media links found.")
+
+    return {
+        'linked': is_linked,
+        'platforms': platforms,
+        'details': {}
+    }
+
+def simulated_days_active():
+    """
+    Days Active feature (Simulated for MVP)
+    """
+    # Ideally: (now - first_tx_timestamp) / 86400
+    return np.random.randint(100, 1000)
+
+def fetch_eth_rates(timeout, price_api=None):
+    """
+    Current (ETH/INR, ETH/USD) from CoinGecko, or None if the response is unusable
+
+    Network errors propagate; `price_api` is an optional resilience.Dependency
+    the request is routed through.
+    """
+    fetch = lambda: requests.get(COINGECKO_URL, timeout=timeout)
+    response = price_api.call(fetch) if price_api else fetch()
+    if response.status_code == 200:
+        data = response.json()
+        if 'ethereum' in data:
+            return data['ethereum']['inr'], data['ethereum']['usd']
+    return None
+
+def interest_for_loan_value(loan_value_inr):
+    """
+    Base interest rate (percent) for a loan of the given INR value
+    """
+    if loan_value_inr > 1000000: # > 10 Lakh
+        return 8.0
+    if loan_value_inr > 500000: # > 5 Lakh
+        return 10.0
+    if loan_value_inr > 100000: # > 1 Lakh
+        return 11.0
+    return 12.0 # Default
+
+# ============= SCORING =============
+
+def vip_score(ens_name):
+    """
+    Fixed score for test ENS names, or None for regular borrowers
+    """
+    # CHEAT CODE FOR TESTING:
+    if ens_name and 'ether' in ens_name.lower():
+        return 850
+    if ens_name and 'sample' in ens_name.lower():
+        return 500
+    return None
+
+def rule_based_score(features):
+    """
+    Fallback scoring when no model is available or prediction fails
+    """
+    score = 600
+    if features['has_social']: score += 50
+    if features['balance_eth'] > 1.0: score += 50
+    if features['tx_count'] > 10: score += 30
+
+    return min(850, max(300, int(score)))
+
+def _predict(model, rows, on_predict=None):
+    # Create DataFrame for prediction (must match training columns)
+    features = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    started = time.perf_counter()
+    predictions = model.predict(features)
+    if on_predict is not None:
+        on_predict(features, predictions, (time.perf_counter() - started) * 1000)
+    return predictions
+
+def score_features_batch(ens_names, feature_rows, model, on_predict=None, verbose=False):
+    """
+    Score many feature rows with a single model call
+
+    VIP rules are applied per row (only while a model is loaded);
+    the remaining rows go through one predict() on a multi-row DataFrame.
+    If that call fails, the rows are predicted one by one so a single bad
+    row does not push the whole batch onto the fallback. Any row the model
+    cannot score falls back to the rule-based logic.
+
+    ARGS:
+        on_predict: Optional callback(features_df, predictions, predict_ms),
+            used for shadow scoring
+        verbose: Log every row's scoring path (the oracle's one-row calls);
+            batch callers leave it off to keep printing off the hot path
+    """
+    scores = [None] * len(feature_rows)
+
+    if model:
+        pending = []
+        for i, ens_name in enumerate(ens_names):
+            vip = vip_score(ens_name)
+            if vip is not None:
+                if verbose:
+                    print("🌟 VIP User Detected! Bypass AI check.")
+                scores[i] = vip
+            else:
+                pending.append(i)
+
+        if pending:
+            try:
+                predictions = _predict(model, [feature_rows[i] for i in pending], on_predict)
+                predicted = [(i, p, int(p)) for i, p in zip(pending, predictions)]
+            except Exception as e:
+                print(f"⚠️ Prediction Error: {e}. "
+                      + ("Falling back to rules." if len(pending) == 1 else "Predicting rows one by one."))
+                predicted = []
+                if len(pending) > 1:
+                    for i in pending:
+                        try:
+                            p = _predict(model, [feature_rows[i]])[0]
+                            predicted.append((i, p, int(p)))
+                        except Exception:
+                            pass  # this row falls back to rules
+            for i, prediction, score in predicted:
+                if verbose:
+                    print(f"🧠 AI Model Prediction: {prediction:.2f}")
+                scores[i] = score
+
+    # Fallback Rule-Based Logic
+    for i, score in enumerate(scores):
+        if score is None:
+            if verbose:
+                print("ℹ️ Using Rule-Based Scoring Fallback")
+            scores[i] = rule_based_score(feature_rows[i])
+
+    return scores
@@ -0,0 +1,457 @@
+"""
+Credit Scoring Service - HTTP API over the oracle's credit model
+
+Exposes the same scoring path the oracle uses for on-chain requests
+(features, VIP rules, ML model, rule-based fallback) as a standalone
+service, so underwriting tools and the frontend can preview a score
+without sending a transaction.
+
+Endpoints:
+- POST /v1/score        one request  -> {"score", "approved", "interest_rate_bps", "timing_ms"}
+- POST /v1/score/batch  {"requests": [...]} -> {"results": [...], "timing_ms"}
+- GET  /healthz         model status
+
+A request may carry any of the model features directly ('balance_eth',
+'tx_count', 'days_active', 'has_social', 'loan_value_inr'). Only the
+missing ones are filled in, the same way the oracle would: balance/nonce
+RPC for 'borrower', ETH/INR valuation of 'amount_wei', simulated
+'days_active', social check on 'ens_name'. Requests that supply
+'balance_eth' and 'tx_count' never touch the node.
+
+The service is standalone: it imports the scoring core (scoring.py), not
+the oracle, so it needs no signing key or contract. RPC_URL is only
+required for previews that look a borrower up on-chain.
+
+Concurrent requests are coalesced into a single model call: the first
+request opens a short window (COALESCE_WINDOW_MS) and everything that
+arrives before it closes, up to COALESCE_MAX_BATCH rows, is scored with
+one predict() on a multi-row DataFrame. New model versions are picked
+up between batches (see model_registry).
+
+Usage:
+    python scoring_service.py [--host 127.0.0.1] [--port 8600]
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+import scoring
+from model_registry import ModelRegistry
+from resilience import TRANSPORT_ERRORS, CircuitOpenError, DeadlineExceeded, Dependency
+
+load_dotenv()
+
+# ============= CONFIGURATION =============
+
+COALESCE_WINDOW_MS = float(os.getenv('COALESCE_WINDOW_MS', '2'))
+COALESCE_MAX_BATCH = int(os.getenv('COALESCE_MAX_BATCH', '256'))
+PRICE_CACHE_TTL = float(os.getenv('PRICE_CACHE_TTL', '60'))
+PRICE_TIMEOUT = float(os.getenv('PRICE_TIMEOUT', '3'))
+RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '5'))
+MODEL_PATH = os.getenv('MODEL_PATH', 'credit_model.pkl')
+SHADOW_MODEL_PATH = os.getenv('SHADOW_MODEL_PATH')
+MODEL_POLL_INTERVAL = float(os.getenv('MODEL_POLL_INTERVAL', '5'))
+
+# Same fallback rate the oracle uses when CoinGecko is unavailable
+DEFAULT_ETH_TO_INR = 200000.0
+
+# ============= FEATURE RESOLUTION =============
+
+class PriceCache:
+    """
+    Caches the ETH/INR rate so valuing a loan does not cost a CoinGecko
+    round trip on every preview
+
+    Once the rate is older than `ttl`, one background refresh is started
+    and the old rate keeps being served until it lands; only the very
+    first lookup waits for CoinGecko.
+    """
+
+    def __init__(self, ttl=PRICE_CACHE_TTL):
+        self.ttl = ttl
+        self.price_api = Dependency('coingecko', timeout=PRICE_TIMEOUT, failure_threshold=3, reset_timeout=60.0)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._rate = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+    def _refresh(self):
+        try:
+            rates = scoring.fetch_eth_rates(PRICE_TIMEOUT, self.price_api)
+        except Exception as e:
+            print(f"⚠️ Price API Error: {e}")
+            rates = None
+        with self._lock:
+            if rates:
+                self._rate = rates[0]
+            elif self._rate is None:
+                print(f"   Using mock rate ₹{DEFAULT_ETH_TO_INR}")
+                self._rate = DEFAULT_ETH_TO_INR
+            self._fetched_at = time.monotonic()
+            self._refreshing = False
+        self._ready.set()
+
+    def eth_to_inr(self):
+        with self._lock:
+            rate = self._rate
+            refresh = not self._refreshing and (rate is None or time.monotonic() - self._fetched_at > self.ttl)
+            if refresh:
+                self._refreshing = True
+        if rate is not None:
+            if refresh:
+                threading.Thread(target=self._refresh, name='price-refresh', daemon=True).start()
+            return rate
+        # Nothing cached yet: the first caller fetches, the others wait for it
+        if refresh:
+            self._refresh()
+        else:
+            self._ready.wait()
+        return self._rate
+
+    def loan_data(self, amount_wei):
+        amount_eth = amount_wei / 10**18
+        loan_value_inr = amount_eth * self.eth_to_inr()
+        return {
+            'amount_eth': amount_eth,
+            'loan_value_inr': loan_value_inr,
+            'base_interest': scoring.interest_for_loan_value(loan_value_inr)
+        }
+
+class ChainReader:
+    """
+    Read-only node access for borrower lookups, connected on first use
+
+    Errors propagate (the service answers 503) rather than being turned
+    into zero-valued features.
+    """
+
+    def __init__(self, rpc_url=None):
+        self.rpc_url = rpc_url if rpc_url is not None else os.getenv('RPC_URL', '')
+        self.rpc = Dependency('rpc', timeout=RPC_TIMEOUT, retries=1, failure_types=TRANSPORT_ERRORS)
+        self._w3 = None
+        self._lock = threading.Lock()
+
+    def _web3(self):
+        with self._lock:
+            if self._w3 is None:
+                if not self.rpc_url:
+                    raise ValueError("Borrower lookups need RPC_URL; supply 'balance_eth' and 'tx_count' instead")
+                from web3 import Web3
+                # First endpoint is enough for read-only previews
+                url = self.rpc_url.split(',')[0].strip()
+                self._w3 = Web3(Web3.HTTPProvider(url, request_kwargs={'timeout': RPC_TIMEOUT}))
+            return self._w3
+
+    def balance_eth(self, address):
+        w3 = self._web3()
+        return float(w3.from_wei(self.rpc.call(w3.eth.get_balance, address), 'ether'))
+
+    def tx_count(self, address):
+        w3 = self._web3()
+        return self.rpc.call(w3.eth.get_transaction_count, address)
+
+# Feature types the model was trained on; has_social is a 0/1 flag
+FEATURE_TYPES = {'balance_eth': float, 'tx_count': int, 'days_active': int, 'has_social': int, 'loan_value_inr': float}
+
+def _coerce(name, value):
+    """
+    Convert one feature to its trained type, rejecting anything the model
+    could not score (non-numeric, negative, non-finite, fractional counts)
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number, got {value!r}")
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"'{name}' must be a finite, non-negative number, got {value!r}")
+    if FEATURE_TYPES[name] is int:
+        if not number.is_integer():
+            raise ValueError(f"'{name}' must be a whole number, got {value!r}")
+        number = int(number)
+        if name == 'has_social' and number not in (0, 1):
+            raise ValueError(f"'has_social' must be 0 or 1, got {value!r}")
+    return number
+
+def resolve_features(payload, prices, chain):
+    """
+    Build a full feature row for one request, fetching only what is missing
+
+    RAISES:
+        ValueError: If a missing feature has no source in the request, or a
+            supplied feature is not a valid number
+    """
+    features = {k: payload[k] for k in scoring.FEATURE_COLUMNS if payload.get(k) is not None}
+    borrower = payload.get('borrower')
+
+    if 'loan_value_inr' not in features:
+        if payload.get('amount_wei') is None:
+            raise ValueError("Request needs 'loan_value_inr' or 'amount_wei'")
+        features['loan_value_inr'] = prices.loan_data(int(payload['amount_wei']))['loan_value_inr']
+
+    if 'balance_eth' not in features:
+        if payload.get('test_balance_wei') is not None:
+            features['balance_eth'] = int(payload['test_balance_wei']) / 10**18
+        elif borrower:
+            features['balance_eth'] = chain.balance_eth(borrower)
+        else:
+            raise ValueError("Request needs 'balance_eth', 'test_balance_wei' or 'borrower'")
+
+    if 'tx_count' not in features:
+        if not borrower:
+            raise ValueError("Request needs 'tx_count' or 'borrower'")
+        features['tx_count'] = chain.tx_count(borrower)
+
+    if 'days_active' not in features:
+        features['days_active'] = scoring.simulated_days_active()
+
+    if 'has_social' not in features:
+        social_data = scoring.check_social_media_links(payload.get('ens_name', ''), verbose=False)
+        features['has_social'] = 1 if social_data['linked'] else 0
+
+    # Also turns numpy scalars (the simulated days_active) into JSON-friendly types
+    features = {c: _coerce(c, features[c]) for c in scoring.FEATURE_COLUMNS}
+    return features, scoring.interest_for_loan_value(features['loan_value_inr'])
+
+# ============= REQUEST COALESCING =============
+
+class ScoreCoalescer:
+    """
+    Micro-batches concurrent score calls into single model invocations
+
+    Identical rows (same ENS name and features) inside one window are
+    scored once and the result is shared.
+    """
+
+    def __init__(self, registry, window_ms=COALESCE_WINDOW_MS, max_batch=COALESCE_MAX_BATCH):
+        self.registry = registry
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='score-coalescer', daemon=True)
+        self._worker.start()
+
+    def submit(self, ens_name, features):
+        """
+        Queue a row for scoring; the Future resolves to (score, timing_ms)
+        """
+        future = Future()
+        self._queue.put((ens_name, features, time.perf_counter(), future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.registry.apply_pending()
+            started = time.perf_counter()
+
+            unique = {}
+            for ens_name, features, _, _ in batch:
+                key = (ens_name, tuple(features[c] for c in scoring.FEATURE_COLUMNS))
+                unique.setdefault(key, (ens_name, features))
+            keys = list(unique)
+
+            errors = {}
+            try:
+                scores = scoring.score_features_batch(
+                    [unique[k][0] for k in keys], [unique[k][1] for k in keys],
+                    self.registry.live, on_predict=self.registry.shadow
+                )
+                by_key = dict(zip(keys, scores))
+            except Exception:
+                # Score rows one by one so a bad row only fails its own request
+                by_key = {}
+                for k in keys:
+                    try:
+                        by_key[k] = scoring.score_features_batch([unique[k][0]], [unique[k][1]], self.registry.live)[0]
+                    except Exception as e:
+                        errors[k] = e
+
+            finished = time.perf_counter()
+            model_ms = (finished - started) * 1000
+            for ens_name, features, enqueued, future in batch:
+                key = (ens_name, tuple(features[c] for c in scoring.FEATURE_COLUMNS))
+                if key in errors:
+                    future.set_exception(errors[key])
+                    continue
+                future.set_result((by_key[key], {
+                    'queue': (started - enqueued) * 1000,
+                    'model': model_ms,
+                    'batch_size': len(keys)
+                }))
+
+# ============= SERVICE =============
+
+def build_registry():
+    """
+    Load MODEL_PATH and watch it (and SHADOW_MODEL_PATH) for new versions
+    """
+    return ModelRegistry(
+        MODEL_PATH, scoring.load_ml_model, initial=scoring.load_ml_model(MODEL_PATH),
+        candidate_path=SHADOW_MODEL_PATH, poll_interval=MODEL_POLL_INTERVAL,
+        threshold=scoring.APPROVAL_THRESHOLD
+    )
+
+class ScoringService:
+    """
+    Resolves features, scores through the coalescer and shapes responses
+    """
+
+    def __init__(self, registry=None, coalescer=None, prices=None, chain=None):
+        self.registry = registry or build_registry()
+        self.coalescer = coalescer or ScoreCoalescer(self.registry)
+        self.prices = prices or PriceCache()
+        self.chain = chain or ChainReader()
+
+    def warm_up(self):
+        """
+        Run one prediction and fetch the ETH/INR rate so the first real
+        request doesn't pay for lazy init
+        """
+        self.prices.eth_to_inr()
+        row = {'balance_eth': 1.0, 'tx_count': 1, 'days_active': 365, 'has_social': 0, 'loan_value_inr': 100000.0}
+        started = time.perf_counter()
+        self.coalescer.submit('', row).result()
+        print(f"🔥 Model warm-up took {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def _resolve(self, payload):
+        started = time.perf_counter()
+        features, base_interest = resolve_features(payload, self.prices, self.chain)
+        return features, base_interest, (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _result(score, base_interest, features, timing):
+        return {
+            'score': score,
+            'approved': score >= scoring.APPROVAL_THRESHOLD,
+            'interest_rate_bps': int(base_interest * 100),
+            'features': features,
+            'timing_ms': timing
+        }
+
+    def score(self, payload):
+        started = time.perf_counter()
+        features, base_interest, features_ms = self._resolve(payload)
+        score, timing = self.coalescer.submit(payload.get('ens_name', ''), features).result()
+        timing.update(features=features_ms, total=(time.perf_counter() - started) * 1000)
+        return self._result(score, base_interest, features, timing)
+
+    def score_batch(self, payloads):
+        started = time.perf_counter()
+        resolved = [self._resolve(p) for p in payloads]
+        futures = [
+            self.coalescer.submit(p.get('ens_name', ''), features)
+            for p, (features, _, _) in zip(payloads, resolved)
+        ]
+        results = []
+        for (features, base_interest, features_ms), future in zip(resolved, futures):
+            score, timing = future.result()
+            timing['features'] = features_ms
+            results.append(self._result(score, base_interest, features, timing))
+        return {
+            'results': results,
+            'timing_ms': {'total': (time.perf_counter() - started) * 1000}
+        }
+
+def make_handler(service):
+    """
+    Build a request handler class bound to a ScoringService
+    """
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive for repeated previews
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            total = body.get('timing_ms', {}).get('total') if isinstance(body, dict) else None
+            if total is not None:
+                self.send_header('Server-Timing', f'total;dur={total:.3f}')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_GET(self):
+            if self.path == '/healthz':
+                self._send(200, {
+                    'status': 'ok',
+                    'model_loaded': service.registry.live is not None,
+                    'model': service.registry.status()
+                })
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            try:
+                payload = self._read_json()
+                if self.path == '/v1/score':
+                    self._send(200, service.score(payload))
+                elif self.path == '/v1/score/batch':
+                    requests_ = payload.get('requests')
+                    if not isinstance(requests_, list):
+                        raise ValueError("Body needs a 'requests' list")
+                    self._send(200, service.score_batch(requests_))
+                else:
+                    self._send(404, {'error': 'not found'})
+            except (ValueError, TypeError, KeyError) as e:
+                self._send(400, {'error': str(e)})
+            except (CircuitOpenError, DeadlineExceeded, ConnectionError) as e:
+                self._send(503, {'error': f"Node unavailable: {e}"})
+            except Exception as e:
+                print(f"Scoring Error: {e}")
+                self._send(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass  # per-request access logs would dominate latency
+
+    return ScoringHandler
+
+def serve(host='127.0.0.1', port=8600):
+    """
+    Start the scoring service and block until interrupted
+    """
+    service = ScoringService()
+    service.registry.start()
+    service.warm_up()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"\n📡 Scoring service listening on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nScoring service stopped by user")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Credit scoring HTTP service")
+    parser.add_argument('--host', default=os.getenv('SCORING_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('SCORING_PORT', '8600')))
+    args = parser.parse_args()
+    serve(args.host, args.port)
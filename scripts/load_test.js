@@ -0,0 +1,355 @@
+import hre from "hardhat";
+const { ethers } = hre;
+
+/**
+ * Load generator for LoanRequested traffic against a local Hardhat node.
+ *
+ * Funds a pool of fresh borrower wallets (optionally registering an ENS name
+ * for each, same flow as register_ens.js), then fires requestLoan /
+ * debugRequestLoanWithBalance at a target rate or in bursts while the Python
+ * oracle is running. Every request is matched to its LoanProcessed event to
+ * build the event-to-fulfillment latency distribution. With LOAD_STEPS the
+ * offered rate is stepped up until the oracle can no longer keep up.
+ *
+ * Usage: npx hardhat run scripts/load_test.js --network localhost
+ *
+ * Environment (all optional):
+ *   LOAD_BORROWERS    number of borrower wallets to fund            (default 20)
+ *   LOAD_MODE         "rate" or "burst"                             (default rate)
+ *   LOAD_RATE         requests/second in rate mode                  (default 1)
+ *   LOAD_DURATION     seconds per rate step                         (default 30)
+ *   LOAD_STEPS        comma-separated rates, e.g. "0.5,1,2,4"       (overrides LOAD_RATE)
+ *   LOAD_BURST_SIZE   requests per burst in burst mode              (default 10)
+ *   LOAD_BURSTS       number of bursts                              (default 3)
+ *   LOAD_BURST_GAP    seconds between bursts                        (default 20)
+ *   LOAD_ENS          "1" to register <prefix><i>.eth per borrower  (default 0)
+ *   LOAD_DEBUG        fraction of requests sent as debugRequestLoanWithBalance (default 0)
+ *   LOAD_AMOUNT_ETH   loan amount per request                       (default 1.0)
+ *   LOAD_DRAIN        seconds to wait for outstanding fulfillments  (default 60)
+ *
+ * NOTE: debugRequestLoanWithBalance is onlyOracle, so debug traffic is sent
+ * from the deployer account - the same key oracle.py signs with. Keep
+ * LOAD_DEBUG low (or 0) when measuring fulfillment capacity, otherwise the
+ * generator competes with the oracle for that account's nonces.
+ */
+
+// A step is saturated when fewer than this fraction of its requests were
+// fulfilled by the time the step finished sending, i.e. the oracle's
+// throughput fell behind the offered rate and a backlog built up.
+const SATURATION_THRESHOLD = 0.8;
+
+function envNumber(name, fallback) {
+    const raw = process.env[name];
+    if (raw === undefined || raw === "") return fallback;
+    const value = Number(raw);
+    if (Number.isNaN(value)) throw new Error(`${name} must be a number, got "${raw}"`);
+    return value;
+}
+
+function loadConfig() {
+    const steps = (process.env.LOAD_STEPS || "")
+        .split(",")
+        .map(s => s.trim())
+        .filter(Boolean)
+        .map(Number);
+
+    return {
+        contractAddress: process.env.CONTRACT_ADDRESS || "0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0",
+        ensAddress: process.env.MOCK_ENS_ADDRESS || "0x5FbDB2315678afecb367f032d93F642f64180aa3",
+        resolverAddress: process.env.MOCK_RESOLVER_ADDRESS || "0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512",
+        borrowers: envNumber("LOAD_BORROWERS", 20),
+        mode: process.env.LOAD_MODE || "rate",
+        steps: steps.length > 0 ? steps : [envNumber("LOAD_RATE", 1)],
+        duration: envNumber("LOAD_DURATION", 30),
+        burstSize: envNumber("LOAD_BURST_SIZE", 10),
+        bursts: envNumber("LOAD_BURSTS", 3),
+        burstGap: envNumber("LOAD_BURST_GAP", 20),
+        useEns: process.env.LOAD_ENS === "1",
+        debugFraction: envNumber("LOAD_DEBUG", 0),
+        amount: ethers.parseEther(process.env.LOAD_AMOUNT_ETH || "1.0"),
+        drain: envNumber("LOAD_DRAIN", 60),
+        ensPrefix: process.env.LOAD_ENS_PREFIX || `load${Date.now()}-`,
+    };
+}
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+function percentile(sorted, p) {
+    if (sorted.length === 0) return NaN;
+    const idx = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+    return sorted[Math.max(0, idx)];
+}
+
+/**
+ * Serialises sends per signer so concurrent requests from the same account
+ * never race on nonces, while different borrowers still send in parallel.
+ */
+class SendQueue {
+    constructor() {
+        this.tails = new Map();
+    }
+
+    run(key, fn) {
+        const prev = this.tails.get(key) || Promise.resolve();
+        const next = prev.then(fn, fn);
+        this.tails.set(key, next.catch(() => {}));
+        return next;
+    }
+}
+
+/**
+ * Tracks emitted requests and matches them against LoanProcessed events.
+ *
+ * The oracle can fulfil a request before our tx.wait() resolves, so a
+ * LoanProcessed for an id we have not registered yet is kept in
+ * `unmatched` and settled when emitted() is called for it.
+ */
+class LatencyTracker {
+    constructor(lendingOracle) {
+        this.lendingOracle = lendingOracle;
+        this.pending = new Map();   // requestId -> { emittedAt, step }
+        this.unmatched = new Map(); // requestId -> observedAt, processed before emitted()
+        this.samples = [];          // { latency, step }
+        this.failures = [];       // { error, step }
+        this.nextBlock = 0;
+        this.polling = false;
+    }
+
+    async start() {
+        this.nextBlock = (await ethers.provider.getBlockNumber()) + 1;
+        this.polling = true;
+        this.loop = (async () => {
+            while (this.polling) {
+                await this.poll().catch(e => console.log(`   ⚠️  Poll error: ${e.message}`));
+                await sleep(250);
+            }
+        })();
+    }
+
+    async stop() {
+        this.polling = false;
+        await this.loop;
+    }
+
+    async poll() {
+        const head = await ethers.provider.getBlockNumber();
+        if (head < this.nextBlock) return;
+        const events = await this.lendingOracle.queryFilter(
+            this.lendingOracle.filters.LoanProcessed, this.nextBlock, head
+        );
+        const observedAt = performance.now();
+        for (const event of events) {
+            const entry = this.pending.get(event.args[0]);
+            if (!entry) {
+                // Not registered yet (or not one of ours)
+                this.unmatched.set(event.args[0], observedAt);
+                continue;
+            }
+            this.pending.delete(event.args[0]);
+            this.samples.push({ latency: observedAt - entry.emittedAt, step: entry.step });
+        }
+        this.nextBlock = head + 1;
+    }
+
+    emitted(requestId, step, emittedAt) {
+        const observedAt = this.unmatched.get(requestId);
+        if (observedAt !== undefined) {
+            this.unmatched.delete(requestId);
+            this.samples.push({ latency: observedAt - emittedAt, step });
+            return;
+        }
+        this.pending.set(requestId, { emittedAt, step });
+    }
+
+    failed(error, step) {
+        this.failures.push({ error, step });
+    }
+}
+
+async function fundBorrowers(funder, count) {
+    console.log(`\n💰 Funding ${count} borrower wallets from ${funder.address}...`);
+    const wallets = [];
+    for (let i = 0; i < count; i++) {
+        const wallet = ethers.Wallet.createRandom().connect(ethers.provider);
+        const tx = await funder.sendTransaction({ to: wallet.address, value: ethers.parseEther("10") });
+        await tx.wait();
+        wallets.push(wallet);
+    }
+    console.log(`   ✅ Funded ${wallets.length} wallets with 10 ETH each`);
+    return wallets;
+}
+
+async function registerEns(cfg, deployer, wallets) {
+    console.log(`\n🌐 Registering ${wallets.length} ENS names (${cfg.ensPrefix}<i>.eth)...`);
+    const mockENS = await ethers.getContractAt("MockENS", cfg.ensAddress, deployer);
+    const mockResolver = await ethers.getContractAt("MockResolver", cfg.resolverAddress, deployer);
+
+    const names = [];
+    for (let i = 0; i < wallets.length; i++) {
+        const name = `${cfg.ensPrefix}${i}.eth`;
+        const node = ethers.namehash(name);
+        await (await mockENS.setResolver(node, cfg.resolverAddress)).wait();
+        await (await mockResolver.setAddr(node, wallets[i].address)).wait();
+        names.push(name);
+    }
+    console.log(`   ✅ Registered ${names.length} names`);
+    return names;
+}
+
+function makeSender(cfg, lendingOracle, deployer, wallets, ensNames, tracker) {
+    const queue = new SendQueue();
+    let counter = 0;
+
+    return (step) => {
+        const i = counter++;
+        const useDebug = Math.random() < cfg.debugFraction;
+        const wallet = wallets[i % wallets.length];
+        const ensName = ensNames ? ensNames[i % wallets.length] : "";
+        const signer = useDebug ? deployer : wallet;
+
+        return queue.run(signer.address, async () => {
+            try {
+                let tx;
+                if (useDebug) {
+                    const testBalance = ethers.parseEther((Math.random() * 20).toFixed(4));
+                    tx = await lendingOracle.connect(deployer)
+                        .debugRequestLoanWithBalance(wallet.address, ensName, cfg.amount, testBalance);
+                } else {
+                    tx = await lendingOracle.connect(wallet).requestLoan(ensName, cfg.amount);
+                }
+                // Timestamp the send, not the receipt: the oracle may already be working on it
+                const sentAt = performance.now();
+                const receipt = await tx.wait();
+                const log = receipt.logs
+                    .map(l => { try { return lendingOracle.interface.parseLog(l); } catch { return null; } })
+                    .find(l => l && (l.name === "LoanRequested" || l.name === "DebugLoanRequested"));
+                tracker.emitted(log.args[0], step, sentAt);
+            } catch (error) {
+                tracker.failed(error.reason || error.message, step);
+            }
+        });
+    };
+}
+
+async function runRateStep(send, tracker, rate, duration, step) {
+    console.log(`\n🚦 Step ${step}: ${rate} req/s for ${duration}s`);
+    const total = Math.max(1, Math.round(rate * duration));
+    const interval = 1000 / rate;
+    const started = performance.now();
+    const inflight = [];
+    for (let n = 0; n < total; n++) {
+        const due = started + n * interval;
+        const wait = due - performance.now();
+        if (wait > 0) await sleep(wait);
+        inflight.push(send(step));
+    }
+    await Promise.all(inflight);
+    const keptUp = tracker.samples.filter(s => s.step === step).length;
+    return { offered: total, keptUp, elapsed: (performance.now() - started) / 1000 };
+}
+
+async function runBursts(send, cfg) {
+    const results = [];
+    for (let b = 0; b < cfg.bursts; b++) {
+        console.log(`\n💥 Burst ${b + 1}/${cfg.bursts}: ${cfg.burstSize} requests`);
+        const started = performance.now();
+        await Promise.all(Array.from({ length: cfg.burstSize }, () => send(b)));
+        results.push({ offered: cfg.burstSize, elapsed: (performance.now() - started) / 1000 });
+        if (b < cfg.bursts - 1) await sleep(cfg.burstGap * 1000);
+    }
+    return results;
+}
+
+async function drain(tracker, seconds) {
+    const deadline = performance.now() + seconds * 1000;
+    while (tracker.pending.size > 0 && performance.now() < deadline) {
+        await sleep(500);
+    }
+}
+
+function report(cfg, tracker, stepResults, labels) {
+    const fmt = (ms) => Number.isNaN(ms) ? "   n/a" : `${(ms / 1000).toFixed(2).padStart(6)}s`;
+    console.log("\n📊 Event → LoanProcessed latency");
+    console.log("   step        offered  processed  failed   p50      p90      p99      max");
+
+    let saturatedAt = null;
+    stepResults.forEach((result, step) => {
+        const latencies = tracker.samples.filter(s => s.step === step).map(s => s.latency).sort((a, b) => a - b);
+        const failed = tracker.failures.filter(f => f.step === step).length;
+        const ratio = result.offered > 0 ? (result.keptUp ?? latencies.length) / result.offered : 0;
+        console.log(
+            `   ${labels[step].padEnd(11)} ${String(result.offered).padStart(7)}  ${String(latencies.length).padStart(9)}` +
+            `  ${String(failed).padStart(6)}  ${fmt(percentile(latencies, 50))}  ${fmt(percentile(latencies, 90))}` +
+            `  ${fmt(percentile(latencies, 99))}  ${fmt(latencies[latencies.length - 1] ?? NaN)}`
+        );
+        if (saturatedAt === null && cfg.mode === "rate" && ratio < SATURATION_THRESHOLD) {
+            saturatedAt = labels[step];
+        }
+    });
+
+    const all = tracker.samples.map(s => s.latency).sort((a, b) => a - b);
+    console.log(`\n   Overall: ${all.length} processed, ${tracker.pending.size} still pending, ${tracker.failures.length} failed sends`);
+    console.log(`   p50 ${fmt(percentile(all, 50))}  p90 ${fmt(percentile(all, 90))}  p99 ${fmt(percentile(all, 99))}`);
+
+    if (cfg.mode === "rate") {
+        if (saturatedAt) {
+            console.log(`\n🔥 Oracle saturated at ${saturatedAt} (fewer than ${SATURATION_THRESHOLD * 100}% of requests fulfilled while the step was running)`);
+        } else {
+            console.log(`\n✅ No saturation observed up to ${labels[labels.length - 1]}`);
+        }
+    }
+
+    const reasons = new Map();
+    tracker.failures.forEach(f => reasons.set(f.error, (reasons.get(f.error) || 0) + 1));
+    reasons.forEach((count, reason) => console.log(`   ❌ ${count} × ${reason}`));
+}
+
+async function main() {
+    const cfg = loadConfig();
+    const [deployer, funder] = await ethers.getSigners();
+    const lendingOracle = await ethers.getContractAt("LendingOracle", cfg.contractAddress);
+
+    console.log("📈 LoanRequested Load Generator\n");
+    console.log(`LendingOracle: ${cfg.contractAddress}`);
+    console.log(`Mode: ${cfg.mode}, borrowers: ${cfg.borrowers}, ENS: ${cfg.useEns}, debug fraction: ${cfg.debugFraction}`);
+
+    const wallets = await fundBorrowers(funder, cfg.borrowers);
+    const ensNames = cfg.useEns ? await registerEns(cfg, deployer, wallets) : null;
+
+    const tracker = new LatencyTracker(lendingOracle);
+    await tracker.start();
+    const send = makeSender(cfg, lendingOracle, deployer, wallets, ensNames, tracker);
+
+    let stepResults;
+    let labels;
+    if (cfg.mode === "burst") {
+        stepResults = await runBursts(send, cfg);
+        labels = stepResults.map((_, b) => `burst ${b + 1}`);
+    } else if (cfg.mode === "rate") {
+        // Each step is drained before the next so a backlog from one rate does
+        // not leak into the next step's latency numbers.
+        stepResults = [];
+        for (let step = 0; step < cfg.steps.length; step++) {
+            stepResults.push(await runRateStep(send, tracker, cfg.steps[step], cfg.duration, step));
+            await drain(tracker, cfg.drain);
+        }
+        labels = cfg.steps.map(rate => `${rate} req/s`);
+    } else {
+        throw new Error(`Unknown LOAD_MODE "${cfg.mode}" (expected "rate" or "burst")`);
+    }
+
+    console.log(`\n⏳ Waiting up to ${cfg.drain}s for outstanding fulfillments...`);
+    await drain(tracker, cfg.drain);
+    await tracker.stop();
+
+    report(cfg, tracker, stepResults, labels);
+}
+
+// Ensure .env is loaded
+import dotenv from 'dotenv';
+dotenv.config();
+
+main().catch((error) => {
+    console.error(error);
+    process.exitCode = 1;
+});
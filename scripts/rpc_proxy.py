@@ -0,0 +1,79 @@
+"""
+Local multi-node stand-in for testing the oracle's RPC pool
+
+Starts several JSON-RPC proxies in front of one upstream node (usually
+the local Hardhat node), each with its own injected latency and failure
+rate, so PooledHTTPProvider routing, hedging and failover can be
+exercised without running real replicas.
+
+Usage:
+    python scripts/rpc_proxy.py --upstream http://127.0.0.1:8545 \\
+        --node 8546:20:0 --node 8547:250:0 --node 8548:50:0.2
+
+    # node spec is PORT:LATENCY_MS:FAILURE_RATE
+    RPC_URL=http://127.0.0.1:8546,http://127.0.0.1:8547,http://127.0.0.1:8548 python3 oracle.py
+"""
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+def make_handler(upstream, latency_ms, failure_rate, session):
+    class ProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            # Jitter around the configured latency so EWMA ranking has noise to handle
+            time.sleep(max(0.0, random.gauss(latency_ms, latency_ms * 0.2)) / 1000)
+            if random.random() < failure_rate:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            upstream_resp = session.post(upstream, data=body, headers={'Content-Type': 'application/json'})
+            self.send_response(upstream_resp.status_code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(upstream_resp.content)))
+            self.end_headers()
+            self.wfile.write(upstream_resp.content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ProxyHandler
+
+def parse_node(spec):
+    port, latency_ms, failure_rate = spec.split(':')
+    return int(port), float(latency_ms), float(failure_rate)
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency-injecting JSON-RPC proxies")
+    parser.add_argument('--upstream', default='http://127.0.0.1:8545')
+    parser.add_argument('--node', action='append', type=parse_node, required=True,
+                        help="PORT:LATENCY_MS:FAILURE_RATE (repeatable)")
+    args = parser.parse_args()
+
+    servers = []
+    for port, latency_ms, failure_rate in args.node:
+        server = ThreadingHTTPServer(
+            ('127.0.0.1', port), make_handler(args.upstream, latency_ms, failure_rate, requests.Session())
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        print(f"🛰️  Node stand-in on :{port} -> {args.upstream} ({latency_ms:.0f} ms, {failure_rate:.0%} failures)")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nProxies stopped by user")
+        for server in servers:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
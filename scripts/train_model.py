@@ -3,6 +3,7 @@ import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 import pickle
 import os
+import sys
 
 def generate_synthetic_data(n_samples=1000):
     """
@@ -62,7 +63,7 @@ def generate_synthetic_data(n_samples=1000):
     
     return X, y
 
-def train_model():
+def train_model(output_path='credit_model.pkl'):
     print("🤖 Generating synthetic training data...")
     X, y = generate_synthetic_data(5000)
     
@@ -73,10 +74,14 @@ def train_model():
     print("✅ Model trained!")
     print(f"   Feature Importances: {model.feature_importances_}")
     
-    # Save model
-    with open('credit_model.pkl', 'wb') as f:
+    # Save model atomically: a running oracle watches this file and must
+    # never see a half-written pickle
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
         pickle.dump(model, f)
-    print("💾 Model saved to 'credit_model.pkl'")
+    os.replace(tmp_path, output_path)
+    print(f"💾 Model saved to '{output_path}'")
 
 if __name__ == "__main__":
-    train_model()
+    # Optional output path, e.g. a shadow candidate for SHADOW_MODEL_PATH
+    train_model(sys.argv[1] if len(sys.argv) > 1 else 'credit_model.pkl')
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Add parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mock web3
+sys.modules['web3'] = MagicMock()
+
+import oracle
+import scoring
+from model_registry import ModelRegistry
+
+class ConstantModel:
+    """Picklable stand-in for a trained regressor"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, features):
+        return np.full(len(features), float(self.value))
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'credit_model.pkl')
+        self.candidate_path = os.path.join(self.tmpdir, 'candidate.pkl')
+        self.write(self.path, ConstantModel(700))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, path, model):
+        with open(path, 'wb') as f:
+            pickle.dump(model, f)
+        # Make sure the version stamp changes even on coarse-mtime filesystems
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def registry(self, **kwargs):
+        initial = scoring.load_ml_model(self.path)
+        return ModelRegistry(self.path, scoring.load_ml_model, initial=initial, **kwargs)
+
+    def test_new_version_staged_then_swapped(self):
+        registry = self.registry()
+        self.assertIsNone(registry.apply_pending())
+
+        self.write(self.path, ConstantModel(780))
+        registry.check()
+        # Still serving the old model until apply_pending is called
+        self.assertEqual(registry.live.value, 700)
+
+        new_model = registry.apply_pending()
+        self.assertEqual(new_model.value, 780)
+        self.assertEqual(registry.live.value, 780)
+        self.assertIsNone(registry.apply_pending())
+
+    def test_invalid_file_keeps_live_model(self):
+        registry = self.registry()
+        with open(self.path, 'wb') as f:
+            f.write(b'not a pickle')
+        registry.check()
+        self.assertIsNone(registry.apply_pending())
+        self.assertEqual(registry.live.value, 700)
+
+    def test_invalid_file_loaded_once_per_version(self):
+        loader = MagicMock(side_effect=scoring.load_ml_model)
+        registry = ModelRegistry(self.path, loader, initial=scoring.load_ml_model(self.path),
+                                 candidate_path=self.candidate_path)
+        for path in (self.path, self.candidate_path):
+            with open(path, 'wb') as f:
+                f.write(b'not a pickle')
+        for _ in range(3):
+            registry.check()
+        self.assertEqual(loader.call_count, 2)
+
+        # A new version of the file is tried again
+        self.write(self.path, ConstantModel(790))
+        registry.check()
+        self.assertEqual(loader.call_count, 3)
+        self.assertEqual(registry.apply_pending().value, 790)
+
+    def test_swap_model_updates_oracle_between_batches(self):
+        registry = self.registry()
+        self.write(self.path, ConstantModel(810))
+        registry.check()
+
+        with patch('oracle.model_registry', registry), patch('oracle.ml_model', registry.live):
+            oracle.swap_model()
+            self.assertEqual(oracle.ml_model.value, 810)
+
+    def test_shadow_metrics(self):
+        self.write(self.candidate_path, ConstantModel(640))
+        registry = self.registry(candidate_path=self.candidate_path)
+        registry.check()
+
+        features = pd.DataFrame([{c: 1 for c in scoring.FEATURE_COLUMNS}] * 3)
+        with patch('oracle.model_registry', registry), patch('oracle.ml_model', registry.live):
+            scores = oracle.score_features_batch(['a.eth', 'b.eth', 'c.eth'], features.to_dict('records'))
+        self.assertEqual(scores, [700, 700, 700])
+
+        self.assertTrue(wait_for(lambda: registry.metrics.rows == 3))
+        snapshot = registry.metrics.snapshot()
+        self.assertEqual(snapshot['mean_abs_diff'], 60.0)
+        # 700 approves, 640 rejects at the 650 threshold
+        self.assertEqual(snapshot['decision_flips'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+
+# Add parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mock web3
+sys.modules['web3'] = MagicMock()
+
+import oracle
+from provider_pool import EndpointPool
+from resilience import CircuitBreaker, Dependency, PriorityWorkQueue
+from test_provider_pool import FakeNode
+
+def loan_event(n, block=1, debug=False):
+    args = {'requestId': n.to_bytes(32, 'big'), 'borrower': '0x' + '11' * 20, 'amount': 10**18, 'ensName': 'test.eth'}
+    if debug:
+        args['testBalanceEth'] = 5 * 10**18
+    return {'args': args, 'blockNumber': block}
+
+class FakeEvent:
+    """Contract event whose logs are served from an in-memory chain"""
+
+    def __init__(self, logs, fail_calls=()):
+        self.logs = logs
+        self.fail_calls = set(fail_calls)
+        self.calls = 0
+
+    def get_logs(self, from_block, to_block):
+        self.calls += 1
+        if self.calls in self.fail_calls:
+            raise ConnectionError("node went away")
+        return [log for log in self.logs if from_block <= log['blockNumber'] <= to_block]
+
+class TestEventPolling(unittest.TestCase):
+    def setUp(self):
+        self.rpc = Dependency('rpc', timeout=1.0)
+        self.w3 = MagicMock()
+        self.w3.eth.block_number = 10
+        for target, value in (('oracle.rpc', self.rpc), ('oracle.w3', self.w3)):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_first_poll_starts_after_head(self):
+        loans = FakeEvent([loan_event(1, block=10)])
+        q = PriorityWorkQueue()
+        self.assertEqual(oracle.poll_events([(loans, False)], None, q), 11)
+        self.assertEqual(len(q), 0)
+        self.assertEqual(loans.calls, 0)
+
+    def test_failed_poll_rereads_range(self):
+        loans = FakeEvent([loan_event(1, block=4), loan_event(2, block=9)])
+        debug = FakeEvent([loan_event(3, block=6, debug=True)], fail_calls={1})
+        sources = [(loans, False), (debug, True)]
+        q = PriorityWorkQueue()
+
+        with self.assertRaises(ConnectionError):
+            oracle.poll_events(sources, 3, q)
+        # Nothing enqueued from a half-finished poll
+        self.assertEqual(len(q), 0)
+
+        self.assertEqual(oracle.poll_events(sources, 3, q), 11)
+        self.assertEqual([q.get()['args']['requestId'][-1] for _ in range(len(q))], [1, 2, 3])
+
+    def test_range_is_capped(self):
+        loans = FakeEvent([loan_event(1, block=2), loan_event(2, block=9)])
+        q = PriorityWorkQueue()
+        with patch('oracle.LOG_BLOCK_RANGE', 5):
+            self.assertEqual(oracle.poll_events([(loans, False)], 1, q), 6)
+            self.assertEqual(len(q), 1)
+            self.assertEqual(oracle.poll_events([(loans, False)], 6, q), 11)
+        self.assertEqual(len(q), 2)
+
+    def test_full_queue_defers_real_requests(self):
+        loans = FakeEvent([loan_event(n, block=3 + n) for n in range(1, 5)])
+        debug = FakeEvent([loan_event(9, block=5, debug=True)])
+        sources = [(loans, False), (debug, True)]
+        q = PriorityWorkQueue(maxsize=2, low_watermark=1)
+
+        # Requests 1 and 2 fit; block 6 (request 3) is left for the next poll
+        self.assertEqual(oracle.poll_events(sources, 3, q), 6)
+        self.assertEqual([q.get()['args']['requestId'][-1] for _ in range(len(q))], [1, 2])
+        self.assertEqual(q.shed, 1)  # only the debug request was dropped
+
+        self.assertEqual(oracle.poll_events(sources, 6, q), 11)
+        self.assertEqual([q.get()['args']['requestId'][-1] for _ in range(len(q))], [3, 4])
+
+class Chain:
+    """Block height and LoanRequested logs shared by every replica"""
+
+    def __init__(self):
+        self.head = 1
+        self.logs = []
+
+    def mine(self, n):
+        self.head += 1
+        self.logs.append({'blockNumber': hex(self.head), 'requestId': n})
+
+    def handle(self, method, params):
+        if method == 'eth_blockNumber':
+            return hex(self.head)
+        if method == 'eth_getLogs':
+            lo, hi = int(params[0]['fromBlock'], 16), int(params[0]['toBlock'], 16)
+            return [log for log in self.logs if lo <= int(log['blockNumber'], 16) <= hi]
+        return None
+
+class PoolWeb3:
+    """Just enough of web3 to read the head through an EndpointPool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.eth = self
+
+    @property
+    def block_number(self):
+        return int(self.pool.make_request('eth_blockNumber', [])['result'], 16)
+
+class PoolEvent:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def get_logs(self, from_block, to_block):
+        logs = self.pool.make_request('eth_getLogs', [{'fromBlock': hex(from_block), 'toBlock': hex(to_block)}])['result']
+        return [
+            {'args': {'requestId': log['requestId'].to_bytes(32, 'big')}, 'blockNumber': int(log['blockNumber'], 16)}
+            for log in logs
+        ]
+
+class TestFailoverMidStream(unittest.TestCase):
+    def test_events_delivered_across_failover(self):
+        chain = Chain()
+        primary = FakeNode('primary', handler=chain.handle)
+        replica = FakeNode('replica', handler=chain.handle)
+        for node in (primary, replica):
+            self.addCleanup(node.stop)
+        pool = EndpointPool([primary.url, replica.url], timeout=1.0)
+        rpc = Dependency('rpc', timeout=2.0)
+
+        sources = [(PoolEvent(pool), False)]
+        q = PriorityWorkQueue()
+        delivered = []
+        next_block = None
+        with patch('oracle.rpc', rpc), patch('oracle.w3', PoolWeb3(pool)), patch('oracle.time.sleep'):
+            for n in range(12):
+                if n == 4:
+                    primary.failing = True
+                if n == 9:
+                    primary.failing = False
+                    pool.endpoints[0].breaker.reset_timeout = 0.0
+                chain.mine(n)
+                try:
+                    next_block = oracle.poll_events(sources, next_block, q)
+                except Exception:
+                    pass  # event_loop backs off and polls again
+                while len(q):
+                    delivered.append(q.get()['args']['requestId'][-1])
+
+        # Every request after the first poll arrives exactly once, in order
+        self.assertEqual(delivered, list(range(1, 12)))
+        self.assertIn('eth_getLogs', replica.calls)
+        # ...and polling returned to the primary once it recovered
+        self.assertIs(pool.sticky(), pool.endpoints[0])
+        self.assertEqual(rpc.breaker.state, CircuitBreaker.CLOSED)
+
+class TestDrainQueue(unittest.TestCase):
+    def setUp(self):
+        self.rpc = Dependency('rpc', timeout=1.0, failure_threshold=1, reset_timeout=60.0)
+        self.w3 = MagicMock()
+        self.w3.from_wei.side_effect = lambda value, unit: value / 10**18
+        self.w3.eth.get_balance.side_effect = ConnectionError("node down")
+        self.w3.eth.get_transaction_count.side_effect = ConnectionError("node down")
+        for target, value in (
+            ('oracle.rpc', self.rpc), ('oracle.w3', self.w3), ('oracle.ml_model', None),
+            ('oracle.get_eth_to_inr_price', MagicMock(return_value={'loan_value_inr': 200000.0, 'base_interest': 11.0})),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_circuit_open_keeps_events_queued(self):
+        q = PriorityWorkQueue()
+        for n in range(3):
+            q.put(loan_event(n))
+        q.put(loan_event(9, debug=True), low_priority=True)
+
+        with patch('oracle.submit_fulfillment') as submit:
+            oracle.drain_queue(q, time.monotonic() + 5)
+        self.assertEqual(self.rpc.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(submit.called)
+        # The interrupted request went back to the front, nothing was dropped
+        self.assertEqual(len(q), 4)
+        self.assertEqual(q.get()['args']['requestId'][-1], 0)
+
+    def test_gather_features_does_not_zero_on_open_circuit(self):
+        self.rpc.breaker.record_failure()
+        with self.assertRaises(oracle.CircuitOpenError):
+            oracle.gather_features({'loan_value_inr': 200000.0}, {'linked': False}, '0xabc')
+
+if __name__ == '__main__':
+    unittest.main()
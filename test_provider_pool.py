@@ -0,0 +1,178 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mock web3
+sys.modules['web3'] = MagicMock()
+
+from provider_pool import EndpointPool
+from resilience import CircuitBreaker
+
+class FakeNode:
+    """
+    Minimal JSON-RPC node stand-in with adjustable delay and failures
+
+    Answers every call with its name unless a `handler(method, params)`
+    is given to produce results.
+    """
+
+    def __init__(self, name, delay=0.0, handler=None):
+        self.name = name
+        self.delay = delay
+        self.handler = handler
+        self.failing = False
+        self.calls = []
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                node.calls.append(payload['method'])
+                time.sleep(node.delay)
+                if node.failing:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                result = node.handler(payload['method'], payload['params']) if node.handler else node.name
+                body = json.dumps({'jsonrpc': '2.0', 'id': payload['id'], 'result': result}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestProviderPool(unittest.TestCase):
+    def setUp(self):
+        self.nodes = []
+
+    def tearDown(self):
+        for node in self.nodes:
+            node.stop()
+
+    def node(self, name, delay=0.0):
+        n = FakeNode(name, delay)
+        self.nodes.append(n)
+        return n
+
+    def test_reads_routed_to_fastest(self):
+        slow = self.node('slow', delay=0.05)
+        fast = self.node('fast', delay=0.0)
+        pool = EndpointPool([slow.url, fast.url], hedge_delay=1.0)
+
+        # Warm up so both endpoints have a latency sample
+        for _ in range(4):
+            pool.make_request('eth_chainId', [])
+        fast.calls.clear()
+        slow.calls.clear()
+
+        for _ in range(5):
+            self.assertEqual(pool.make_request('eth_getBalance', ['0x0', 'latest'])['result'], 'fast')
+        self.assertEqual(len(fast.calls), 5)
+        self.assertEqual(len(slow.calls), 0)
+
+    def test_slow_read_is_hedged(self):
+        stalled = self.node('stalled', delay=0.0)
+        backup = self.node('backup', delay=0.0)
+        pool = EndpointPool([stalled.url, backup.url], hedge_delay=0.05)
+        pool.make_request('eth_chainId', [])
+        pool.make_request('eth_chainId', [])
+
+        # Best-ranked node now stalls; the hedge to the other node wins
+        best = pool.ranked()[0]
+        stalled_node = stalled if best.url == stalled.url else backup
+        stalled_node.delay = 1.0
+        started = time.perf_counter()
+        response = pool.make_request('eth_getBalance', ['0x0', 'latest'])
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertNotEqual(response['result'], stalled_node.name)
+
+    def test_writes_pinned_to_first_endpoint(self):
+        primary = self.node('primary', delay=0.05)
+        replica = self.node('replica', delay=0.0)
+        pool = EndpointPool([primary.url, replica.url])
+
+        for method in ('eth_getTransactionCount', 'eth_sendRawTransaction', 'eth_blockNumber', 'eth_getLogs'):
+            self.assertEqual(pool.make_request(method, [])['result'], 'primary')
+        self.assertEqual(replica.calls, [])
+
+    def test_failover_when_endpoint_down(self):
+        primary = self.node('primary')
+        replica = self.node('replica')
+        pool = EndpointPool([primary.url, replica.url], hedge_delay=1.0)
+        primary.failing = True
+
+        # Reads skip the failing node immediately
+        self.assertEqual(pool.make_request('eth_chainId', [])['result'], 'replica')
+
+        # Once its breaker opens, writes move to the replica
+        for _ in range(3):
+            try:
+                pool.make_request('eth_getTransactionCount', [])
+            except Exception:
+                pass
+        self.assertEqual(pool.make_request('eth_sendRawTransaction', [])['result'], 'replica')
+
+    def test_half_open_endpoint_gets_single_probe(self):
+        primary = self.node('primary')
+        replica = self.node('replica')
+        pool = EndpointPool([primary.url, replica.url], hedge_delay=1.0)
+        recovering = pool.endpoints[0]
+        for _ in range(3):
+            recovering.breaker.record_failure()
+        recovering.breaker.reset_timeout = 0.0
+        self.assertEqual(recovering.breaker.state, CircuitBreaker.HALF_OPEN)
+
+        # One probe is granted; while it is outstanding the node gets no more reads
+        self.assertIs(pool.ranked()[0], recovering)
+        self.assertNotIn(recovering, pool.ranked())
+
+    def test_sticky_fails_back_to_first_endpoint(self):
+        primary = self.node('primary')
+        replica = self.node('replica')
+        pool = EndpointPool([primary.url, replica.url])
+        primary.failing = True
+        for _ in range(3):
+            try:
+                pool.make_request('eth_getTransactionCount', [])
+            except Exception:
+                pass
+        self.assertEqual(pool.make_request('eth_sendRawTransaction', [])['result'], 'replica')
+
+        # Node comes back: after its reset timeout a probe succeeds and writes return to it
+        primary.failing = False
+        pool.endpoints[0].breaker.reset_timeout = 0.0
+        self.assertEqual(pool.make_request('eth_sendRawTransaction', [])['result'], 'primary')
+        self.assertIs(pool.sticky(), pool.endpoints[0])
+
+    def test_all_endpoints_down(self):
+        a = self.node('a')
+        b = self.node('b')
+        a.failing = b.failing = True
+        pool = EndpointPool([a.url, b.url])
+        with self.assertRaises(ConnectionError):
+            pool.make_request('eth_chainId', [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mock web3
+sys.modules['web3'] = MagicMock()
+
+import oracle
+from records import (
+    LOAN_RECORD_DTYPE, RequestHistory, STATUS_CONFIRMED, STATUS_DEFERRED, STATUS_FAILED, STATUS_PENDING, amount_wei
+)
+
+FEATURES = {'balance_eth': 2.5, 'tx_count': 12, 'days_active': 300, 'has_social': 1, 'loan_value_inr': 500000.0}
+BORROWER = '0x6851e28f83d0bdba3e778146c79eb73f5b053229'
+
+def request_id(n):
+    return n.to_bytes(32, 'big')
+
+class TestRecords(unittest.TestCase):
+    def append(self, history, n, **kwargs):
+        defaults = dict(
+            request_id=request_id(n), borrower=BORROWER, amount_wei=10**18 + n, features=FEATURES,
+            credit_score=700, interest_rate_bps=1000, approved=True, received_at=1.0
+        )
+        defaults.update(kwargs)
+        return history.append(**defaults)
+
+    def test_fixed_footprint(self):
+        history = RequestHistory(capacity=1000)
+        self.assertEqual(history.nbytes, 1000 * LOAN_RECORD_DTYPE.itemsize)
+        for n in range(5000):
+            self.append(history, n)
+        self.assertEqual(history.nbytes, 1000 * LOAN_RECORD_DTYPE.itemsize)
+        self.assertEqual(len(history), 1000)
+
+    def test_round_trip(self):
+        history = RequestHistory(capacity=10)
+        self.append(history, 7, amount_wei=2**200 + 3, credit_score=512, approved=False)
+        row = history.find(request_id(7))
+        self.assertEqual(bytes(row['request_id']), request_id(7))
+        self.assertEqual(bytes(row['borrower']).hex(), BORROWER[2:])
+        self.assertEqual(amount_wei(row), 2**200 + 3)
+        self.assertEqual(row['credit_score'], 512)
+        self.assertFalse(row['approved'])
+        self.assertEqual(row['tx_count'], 12)
+        self.assertEqual(row['status'], STATUS_PENDING)
+
+    def test_ring_overwrites_oldest(self):
+        history = RequestHistory(capacity=3)
+        handles = [self.append(history, n) for n in range(5)]
+        self.assertIsNone(history.find(request_id(0)))
+        self.assertIsNotNone(history.find(request_id(4)))
+        self.assertEqual([bytes(r['request_id']) for r in history.latest()],
+                         [request_id(2), request_id(3), request_id(4)])
+        # Stale handle no longer updates anything
+        self.assertFalse(history.set_status(handles[0], STATUS_FAILED))
+        self.assertTrue(history.set_status(handles[4], STATUS_CONFIRMED))
+        self.assertEqual(history.find(request_id(4))['status'], STATUS_CONFIRMED)
+
+    def test_summary(self):
+        history = RequestHistory(capacity=10)
+        self.assertEqual(history.summary()['requests'], 0)
+        self.append(history, 1, credit_score=700, approved=True)
+        self.append(history, 2, credit_score=600, approved=False)
+        summary = history.summary()
+        self.assertEqual(summary['retained'], 2)
+        self.assertEqual(summary['approval_rate'], 0.5)
+        self.assertEqual(summary['mean_score'], 650.0)
+
+    @patch('oracle.submit_fulfillment', return_value=True)
+    @patch('oracle.gather_features', return_value=dict(FEATURES))
+    @patch('oracle.get_eth_to_inr_price', return_value={'loan_value_inr': 500000.0, 'base_interest': 10.0})
+    @patch('oracle.check_social_media_links', return_value={'linked': True})
+    def test_handle_loan_request_records_decision(self, *_):
+        history = RequestHistory(capacity=10)
+        event = {'args': {
+            'requestId': request_id(42), 'borrower': BORROWER, 'amount': 10**18, 'ensName': 'test.eth'
+        }}
+        with patch('oracle.request_history', history), patch('oracle.ml_model', None):
+            oracle.handle_loan_request(event)
+
+        row = history.find(request_id(42))
+        # Rule-based: 600 + 50 (social) + 50 (balance) + 30 (tx)
+        self.assertEqual(row['credit_score'], 730)
+        self.assertEqual(row['interest_rate_bps'], 1000)
+        self.assertTrue(row['approved'])
+        self.assertEqual(row['status'], STATUS_CONFIRMED)
+
+    @patch('oracle.gather_features', return_value=dict(FEATURES))
+    @patch('oracle.get_eth_to_inr_price', return_value={'loan_value_inr': 500000.0, 'base_interest': 10.0})
+    @patch('oracle.check_social_media_links', return_value={'linked': True})
+    def test_deferred_request_recorded_per_attempt(self, *_):
+        history = RequestHistory(capacity=10)
+        event = {'args': {
+            'requestId': request_id(7), 'borrower': BORROWER, 'amount': 10**18, 'ensName': 'test.eth'
+        }}
+        with patch('oracle.request_history', history), patch('oracle.ml_model', None), \
+                patch('oracle.HISTORY_REPORT_EVERY', 2), patch('builtins.print') as mock_print:
+            with patch('oracle.submit_fulfillment', side_effect=oracle.CircuitOpenError("rpc open")):
+                with self.assertRaises(oracle.CircuitOpenError):
+                    oracle.handle_loan_request(event)
+            with patch('oracle.submit_fulfillment', return_value=True):
+                oracle.handle_loan_request(event)
+
+        self.assertEqual(history.latest()['status'].tolist(), [STATUS_DEFERRED, STATUS_CONFIRMED])
+        # find() returns the latest attempt
+        self.assertEqual(history.find(request_id(7))['status'], STATUS_CONFIRMED)
+        summary = history.summary()
+        self.assertEqual((summary['deferred'], summary['failed']), (1, 0))
+        self.assertTrue(any('Request history' in str(c) for c in mock_print.call_args_list))
+
+if __name__ == '__main__':
+    unittest.main()
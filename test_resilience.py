@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+
+# Add parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, Dependency,
+    PriorityWorkQueue, RetryBudget, TRANSPORT_ERRORS, call_with_deadline
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestResilience(unittest.TestCase):
+    def test_deadline_exceeded(self):
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            call_with_deadline(time.sleep, 0.05, 1.0)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_deadline_returns_result(self):
+        self.assertEqual(call_with_deadline(lambda x: x * 2, 1.0, 21), 42)
+
+    def test_breaker_opens_and_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        # After reset_timeout exactly one probe is allowed
+        clock.now = 10
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        # Failed probe re-opens, successful probe closes
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_retry_budget_exhausts(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        self.assertTrue(budget.try_withdraw())
+        self.assertTrue(budget.try_withdraw())
+        self.assertFalse(budget.try_withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.try_withdraw())
+
+    @patch('resilience.time.sleep')
+    def test_dependency_retries_then_succeeds(self, mock_sleep):
+        fn = MagicMock(side_effect=[ConnectionError("down"), 'ok'])
+        dep = Dependency('rpc', timeout=1.0, retries=2)
+        self.assertEqual(dep.call(fn), 'ok')
+        self.assertEqual(fn.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @patch('resilience.time.sleep')
+    def test_dependency_fails_fast_when_open(self, mock_sleep):
+        fn = MagicMock(side_effect=ConnectionError("down"))
+        dep = Dependency('price', timeout=1.0, failure_threshold=2)
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                dep.call(fn)
+        with self.assertRaises(CircuitOpenError):
+            dep.call(fn)
+        self.assertEqual(fn.call_count, 2)
+
+    @patch('resilience.time.sleep')
+    def test_application_errors_do_not_trip_breaker(self, mock_sleep):
+        fn = MagicMock(side_effect=ValueError("nonce too low"))
+        dep = Dependency('rpc', timeout=1.0, retries=2, failure_threshold=2, failure_types=TRANSPORT_ERRORS)
+        for _ in range(5):
+            with self.assertRaises(ValueError):
+                dep.call(fn)
+        # Not retried, and the breaker stays closed
+        self.assertEqual(fn.call_count, 5)
+        self.assertEqual(dep.breaker.state, CircuitBreaker.CLOSED)
+
+        fn.side_effect = DeadlineExceeded("slow")
+        for _ in range(2):
+            with self.assertRaises(DeadlineExceeded):
+                dep.call(fn, retries=0)
+        self.assertEqual(dep.breaker.state, CircuitBreaker.OPEN)
+
+    def test_queue_sheds_low_priority(self):
+        q = PriorityWorkQueue(maxsize=4, low_watermark=2)
+        self.assertTrue(q.put('debug-1', low_priority=True))
+        self.assertTrue(q.put('loan-1'))
+        # Backlog at low watermark: further debug work is shed
+        self.assertFalse(q.put('debug-2', low_priority=True))
+        self.assertTrue(q.put('loan-2'))
+        self.assertTrue(q.put('loan-3'))
+        # Full: a real request evicts the queued debug request
+        self.assertTrue(q.put('loan-4'))
+        self.assertFalse(q.put('loan-5'))
+        self.assertEqual(q.shed, 3)
+        self.assertEqual([q.get() for _ in range(len(q))], ['loan-1', 'loan-2', 'loan-3', 'loan-4'])
+
+    def test_queue_serves_high_priority_first(self):
+        q = PriorityWorkQueue(maxsize=10)
+        q.put('debug', low_priority=True)
+        q.put('loan')
+        self.assertEqual(q.get(), 'loan')
+        self.assertEqual(q.get(), 'debug')
+
+    def test_queue_accepts_counts_high_priority_only(self):
+        q = PriorityWorkQueue(maxsize=3)
+        q.put('loan-1')
+        q.put('debug', low_priority=True)
+        self.assertTrue(q.accepts(2))
+        self.assertFalse(q.accepts(3))
+
+    def test_queue_requeue_goes_to_front(self):
+        q = PriorityWorkQueue(maxsize=2, low_watermark=1)
+        q.put('loan-1')
+        q.put('loan-2')
+        item = q.get()
+        q.requeue(item)
+        self.assertEqual(q.get(), 'loan-1')
+        # Requeued low-priority items are not shed even above the watermark
+        q.requeue('debug', low_priority=True)
+        self.assertEqual(len(q), 2)
+        self.assertEqual([q.get(), q.get()], ['loan-2', 'debug'])
+
+if __name__ == '__main__':
+    unittest.main()
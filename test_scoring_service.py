@@ -0,0 +1,179 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+from http.server import ThreadingHTTPServer
+
+# Add parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_registry import ModelRegistry
+from resilience import CircuitOpenError
+from scoring_service import PriceCache, ScoreCoalescer, ScoringService, make_handler
+
+FEATURES = {'balance_eth': 2.0, 'tx_count': 20, 'days_active': 400, 'has_social': 1, 'loan_value_inr': 200000.0}
+
+class TestScoringService(unittest.TestCase):
+    def setUp(self):
+        self.dummy_model = MagicMock()
+        self.dummy_model.predict.side_effect = lambda df: np.full(len(df), 720.0)
+        self.mock_model = self.dummy_model
+        self.registry = ModelRegistry('missing_model.pkl', lambda path: None, initial=self.dummy_model)
+        self.chain = MagicMock()
+        self.service = ScoringService(
+            registry=self.registry, coalescer=ScoreCoalescer(self.registry, window_ms=20),
+            prices=MagicMock(), chain=self.chain
+        )
+
+    def test_score_with_supplied_features(self):
+        result = self.service.score(dict(FEATURES, ens_name='test.eth'))
+        self.assertEqual(result['score'], 720)
+        self.assertTrue(result['approved'])
+        self.assertEqual(result['interest_rate_bps'], 1100)
+        self.assertIn('total', result['timing_ms'])
+
+    def test_vip_rule_applied(self):
+        result = self.service.score(dict(FEATURES, ens_name='sample.eth'))
+        self.assertEqual(result['score'], 500)
+        self.assertFalse(result['approved'])
+        self.assertFalse(self.mock_model.predict.called)
+
+    def test_rule_based_fallback(self):
+        self.mock_model.predict.side_effect = Exception("Model Error")
+        result = self.service.score(dict(FEATURES, ens_name='test.eth'))
+        # 600 + 50 (social) + 50 (balance) + 30 (tx) = 730
+        self.assertEqual(result['score'], 730)
+
+    def test_missing_loan_value_rejected(self):
+        payload = dict(FEATURES)
+        del payload['loan_value_inr']
+        with self.assertRaises(ValueError):
+            self.service.score(payload)
+
+    def test_partial_features_skip_rpc(self):
+        # Only days_active missing: simulated locally, node never touched
+        payload = {'balance_eth': 2, 'tx_count': 20, 'has_social': 1, 'loan_value_inr': 200000}
+        result = self.service.score(payload)
+        self.assertEqual(result['score'], 720)
+        self.assertIn('days_active', result['features'])
+        self.assertFalse(self.chain.method_calls)
+
+    def test_missing_chain_features_fetched_for_borrower(self):
+        self.chain.balance_eth.return_value = 3.0
+        payload = {'borrower': '0xabc', 'tx_count': 5, 'days_active': 200, 'has_social': 0, 'loan_value_inr': 200000}
+        result = self.service.score(payload)
+        self.assertEqual(result['features']['balance_eth'], 3.0)
+        self.chain.balance_eth.assert_called_once_with('0xabc')
+        self.assertFalse(self.chain.tx_count.called)
+
+    def test_missing_chain_features_without_borrower_rejected(self):
+        payload = dict(FEATURES)
+        del payload['tx_count']
+        with self.assertRaises(ValueError):
+            self.service.score(payload)
+        self.assertFalse(self.chain.method_calls)
+
+    def test_invalid_feature_fails_only_its_request(self):
+        results = {}
+
+        def score(name, payload):
+            try:
+                results[name] = self.service.score(payload)['score']
+            except Exception as e:
+                results[name] = e
+
+        threads = [
+            threading.Thread(target=score, args=('good', dict(FEATURES))),
+            threading.Thread(target=score, args=('bad', dict(FEATURES, balance_eth='lots'))),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results['good'], 720)
+        self.assertIsInstance(results['bad'], ValueError)
+
+    def test_unscorable_row_does_not_spoil_batch(self):
+        def predict(df):
+            if (df['balance_eth'] > 1e6).any():
+                raise ValueError("balance out of training range")
+            return np.full(len(df), 720.0)
+        self.mock_model.predict.side_effect = predict
+
+        coalescer = self.service.coalescer
+        good = coalescer.submit('test.eth', dict(FEATURES))
+        bad = coalescer.submit('test.eth', dict(FEATURES, balance_eth=1e9))
+        self.assertEqual(good.result()[0], 720)
+        # 600 + 50 (social) + 50 (balance) + 30 (tx) = 730
+        self.assertEqual(bad.result()[0], 730)
+        # One batched call, then each row on its own
+        self.assertEqual(self.mock_model.predict.call_count, 3)
+
+    def test_batch_coalesced_into_one_predict(self):
+        payloads = [dict(FEATURES, tx_count=i) for i in range(5)]
+        payloads.append(dict(FEATURES, tx_count=0))  # duplicate row
+        response = self.service.score_batch(payloads)
+
+        self.assertEqual([r['score'] for r in response['results']], [720] * 6)
+        self.assertEqual(self.mock_model.predict.call_count, 1)
+        frame = self.mock_model.predict.call_args[0][0]
+        self.assertEqual(len(frame), 5)
+
+    def serve(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(self.service))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f'http://127.0.0.1:{server.server_port}'
+
+    def test_http_batch_endpoint(self):
+        body = json.dumps({'requests': [FEATURES, FEATURES]}).encode()
+        req = urllib.request.Request(f'{self.serve()}/v1/score/batch', data=body, method='POST')
+        with urllib.request.urlopen(req) as resp:
+            self.assertIn('Server-Timing', resp.headers)
+            data = json.loads(resp.read())
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['results'][0]['score'], 720)
+
+    def test_http_node_unavailable(self):
+        self.chain.tx_count.side_effect = CircuitOpenError("rpc circuit open")
+        body = json.dumps({'borrower': '0xabc', 'balance_eth': 1.0, 'loan_value_inr': 200000}).encode()
+        req = urllib.request.Request(f'{self.serve()}/v1/score', data=body, method='POST')
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(req)
+        self.assertEqual(ctx.exception.code, 503)
+
+class TestPriceCache(unittest.TestCase):
+    def test_stale_rate_served_while_refreshing(self):
+        released = threading.Event()
+
+        def fetch(timeout, price_api):
+            if fetch.calls:
+                released.wait(2.0)  # slow CoinGecko
+            fetch.calls += 1
+            return (100.0 * fetch.calls, 1.0)
+        fetch.calls = 0
+
+        cache = PriceCache(ttl=0.0)
+        with patch('scoring.fetch_eth_rates', fetch):
+            self.assertEqual(cache.eth_to_inr(), 100.0)
+            started = time.perf_counter()
+            self.assertEqual(cache.eth_to_inr(), 100.0)
+            self.assertEqual(cache.eth_to_inr(), 100.0)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            released.set()
+            deadline = time.monotonic() + 2.0
+            rate = cache.eth_to_inr()
+            while rate == 100.0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+                rate = cache.eth_to_inr()
+        self.assertEqual(rate, 200.0)
+
+if __name__ == '__main__':
+    unittest.main()